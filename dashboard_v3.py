@@ -13,6 +13,18 @@ import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 # =============================================================================
 # 설정
 # =============================================================================
@@ -50,6 +62,18 @@ def load_csv_safe(filepath):
     except Exception:
         return pd.DataFrame()
 
+def load_output_safe(filepath):
+    """build_outputs.py가 함께 저장한 Parquet이 최신이면 우선 사용, 없으면 CSV"""
+    parquet_path = filepath.with_suffix(".parquet")
+    if HAS_PYARROW and parquet_path.exists() and (
+        not filepath.exists() or parquet_path.stat().st_mtime >= filepath.stat().st_mtime
+    ):
+        try:
+            return pq.read_table(parquet_path, memory_map=True).to_pandas()
+        except Exception:
+            pass
+    return load_csv_safe(filepath)
+
 @st.cache_data
 def load_all_data():
     data = {}
@@ -65,9 +89,26 @@ def load_all_data():
         "corr_rank_price": "corr_rank_price.csv"
     }
     for key, filename in files.items():
-        data[key] = load_csv_safe(OUTPUT_DIR / filename)
+        data[key] = load_output_safe(OUTPUT_DIR / filename)
     return data
 
+@st.cache_data
+def load_price_index():
+    """clean_long 단가 정렬 인덱스 (가격 밴드 필터용, 최초 1회만 정렬)"""
+    df = load_all_data()["clean_long"]
+    if df.empty or "unit_price" not in df.columns:
+        return None
+    unit_price = df["unit_price"].to_numpy(dtype=float)
+    order = np.argsort(unit_price, kind="stable")  # NaN은 맨 뒤로 정렬됨
+    return order, unit_price[order]
+
+def price_band_positions(price_index, price_low, price_high):
+    """price_low <= unit_price <= price_high 인 행의 위치 (이진 탐색)"""
+    order, sorted_prices = price_index
+    lo = np.searchsorted(sorted_prices, price_low, side="left")
+    hi = np.searchsorted(sorted_prices, price_high, side="right")
+    return order[lo:hi]
+
 # =============================================================================
 # CSS 스타일
 # =============================================================================
@@ -224,6 +265,19 @@ def render_section(title, desc="", icon="📊"):
     </div>
     """, unsafe_allow_html=True)
 
+if HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def weighted_sov(codes, weights, ngroups):
+        """그룹 코드별 가중치 합계 (codes: pd.factorize 결과, 음수/NaN 제외 후 전달)"""
+        out = np.zeros(ngroups)
+        for i in range(codes.size):
+            out[codes[i]] += weights[i]
+        return out
+else:
+    def weighted_sov(codes, weights, ngroups):
+        """그룹 코드별 가중치 합계 (numba 미설치 시 np.bincount)"""
+        return np.bincount(codes, weights=weights, minlength=ngroups)
+
 def is_calmf(row):
     brand = str(row.get("brand", "")).lower()
     name = str(row.get("product_name", "")).lower()
@@ -299,8 +353,8 @@ def create_pareto_chart(df, calmf_price, calmf_rank):
     
     fig = go.Figure()
     
-    # 모든 상품 (호버에 제품명 포함)
-    fig.add_trace(go.Scatter(
+    # 모든 상품 (호버에 제품명 포함, 점 개수에 비례하므로 WebGL 렌더링)
+    fig.add_trace(go.Scattergl(
         x=df_valid["unit_price"],
         y=df_valid["page_rank"],
         mode="markers",
@@ -1055,21 +1109,32 @@ def main():
             st.markdown("<h5 style='color: #ffffff;'>브랜드 SOV (캄프 유사가격대 ±15%)</h5>", unsafe_allow_html=True)
             
             # 캄프 가격대 ±15% 내 브랜드 SOV 계산
-            if calmf_price and not df_main.empty:
+            price_index = load_price_index()
+            if calmf_price and price_index is not None:
                 price_low = calmf_price * 0.85
                 price_high = calmf_price * 1.15
-                
-                # 해당 가격대 필터
-                band_df = df_main[(df_main["unit_price"] >= price_low) & (df_main["unit_price"] <= price_high)].copy()
-                
-                if not band_df.empty and "brand" in band_df.columns and "page_rank" in band_df.columns:
-                    # 가중 SOV 계산 (1/√rank)
-                    band_df["weight"] = 1 / np.sqrt(band_df["page_rank"])
-                    total_weight = band_df["weight"].sum()
-                    
-                    brand_sov = band_df.groupby("brand")["weight"].sum().reset_index()
-                    brand_sov["sov"] = (brand_sov["weight"] / total_weight * 100).round(2)
-                    brand_sov = brand_sov.sort_values("sov", ascending=False).head(10)
+
+                # 해당 가격대 필터 (정렬 인덱스 이진 탐색)
+                band_idx = price_band_positions(price_index, price_low, price_high)
+
+                if band_idx.size and "brand" in df_main.columns and "page_rank" in df_main.columns:
+                    codes, brands = pd.factorize(df_main["brand"].to_numpy()[band_idx], sort=False)
+                else:
+                    brands = []
+
+                if len(brands):
+                    # 가중 SOV 계산 (1/√rank) - 브랜드 코드별 합산
+                    weight = 1 / np.sqrt(df_main["page_rank"].to_numpy(dtype=np.float32)[band_idx])
+                    total_weight = np.nansum(weight, dtype=np.float64)
+                    valid = (codes >= 0) & ~np.isnan(weight)
+                    brand_weight = weighted_sov(codes[valid], weight[valid], len(brands))
+                    sov = np.round(brand_weight / total_weight * 100, 2)
+
+                    # 상위 10개 브랜드 (부분 정렬)
+                    top_n = min(10, len(sov))
+                    top = np.argpartition(-sov, top_n - 1)[:top_n]
+                    top = top[np.argsort(-sov[top], kind="stable")]
+                    brand_sov = pd.DataFrame({"brand": brands[top], "sov": sov[top]})
                     
                     # 캄프 강조
                     brand_sov["is_calmf"] = brand_sov["brand"].apply(lambda x: "캄프" in str(x).lower() or "calmf" in str(x).lower())
@@ -1082,7 +1147,8 @@ def main():
                             orientation="h",
                             marker_color=colors,
                             text=brand_sov["sov"].apply(lambda x: f"{x:.1f}%"),
-                            textposition="outside"
+                            textposition="outside",
+                            hovertemplate="%{y}: %{x:.1f}%<extra></extra>"
                         )
                     ])
                     fig_sov.update_layout(
@@ -1091,7 +1157,8 @@ def main():
                         font=dict(color="#ffffff"),
                         height=450,  # 높이 늘림
                         xaxis_title="SOV (%)",
-                        yaxis=dict(autorange="reversed")
+                        yaxis=dict(autorange="reversed"),
+                        uirevision="sov"  # 리렌더 시 줌/범례 상태 유지
                     )
                     st.plotly_chart(fig_sov, use_container_width=True)
                     
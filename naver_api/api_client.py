@@ -5,10 +5,23 @@
 - 쇼핑 검색 API
 """
 
-import requests
-import json
-from datetime import datetime, timedelta
+import asyncio
+import functools
+import hashlib
+import threading
+from collections import Counter
+from itertools import chain, compress
+from concurrent.futures import ThreadPoolExecutor
+import time
+import httpx
+import orjson
+import ijson
+from cachetools import LRUCache, TTLCache
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from types import MappingProxyType
 from typing import List, Dict, Optional, Union
+import numpy as np
 import pandas as pd
 
 from config import (
@@ -20,6 +33,242 @@ from config import (
     SHOPPING_SEARCH_URL
 )
 
+# 검색어 트렌드 기본 요청 본문 (device/gender/ages 미지정 시 dict 생성/직렬화 생략)
+_SEARCH_TREND_BODY_TEMPLATE = b'{"startDate":"%s","endDate":"%s","timeUnit":"%s","keywordGroups":%s}'
+
+# 쇼핑 검색 응답 필드 → DataFrame 컬럼명
+PRODUCT_COLUMNS = {
+    "title": "title",
+    "link": "link",
+    "image": "image",
+    "lprice": "lprice",
+    "hprice": "hprice",
+    "mallName": "mall_name",
+    "productId": "product_id",
+    "productType": "product_type",
+    "brand": "brand",
+    "maker": "maker",
+    "category1": "category1",
+    "category2": "category2",
+    "category3": "category3",
+    "category4": "category4",
+}
+PRICE_FIELDS = ("lprice", "hprice")  # int64 컬럼, 나머지는 문자열(object)
+
+# 쇼핑 검색 페이지 동시 요청 수 (네이버 API 호출 제한 고려)
+SEARCH_CONCURRENCY = 5
+
+# 요청 타임아웃(초) / 429·5xx 재시도 (지수 백오프)
+REQUEST_TIMEOUT = 30.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3
+
+# 엔드포인트별 응답 캐시 TTL (초) - 트렌드 데이터는 자주 바뀌지 않음
+CACHE_TTL = {
+    DATALAB_SEARCH_URL: 3600,
+    DATALAB_SHOPPING_URL: 3600,
+    DATALAB_SHOPPING_KEYWORD_URL: 3600,
+    SHOPPING_SEARCH_URL: 300,
+}
+DEFAULT_CACHE_TTL = 300
+CACHE_MAXSIZE = 512
+
+class NaverAPIError(Exception):
+    """네이버 API 오류 응답 (4xx/5xx), 메시지는 "HTTP Error: {상태코드} - {응답 본문}" 형식"""
+    
+    def __init__(self, status_code: int, text: str = ""):
+        self.status_code = status_code
+        self.text = text
+        message = f"HTTP Error: {status_code}"
+        if text:
+            message += f" - {text}"
+        super().__init__(message)
+
+
+_response_caches = {}
+_stale_cache = LRUCache(maxsize=CACHE_MAXSIZE)  # 요청 실패 시 반환할 마지막 성공 응답
+_cache_lock = threading.Lock()
+
+
+def _cache_key(url: str, payload: Union[dict, bytes]) -> bytes:
+    """(url, 정규화된 요청 본문/파라미터) 캐시 키"""
+    if not isinstance(payload, bytes):
+        payload = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(url.encode() + payload).digest()
+
+
+def _cache_lookup(url: str, key: bytes):
+    with _cache_lock:
+        cache = _response_caches.get(url)
+        return cache.get(key) if cache is not None else None
+
+
+def _cache_store(url: str, key: bytes, value) -> None:
+    with _cache_lock:
+        cache = _response_caches.get(url)
+        if cache is None:
+            cache = _response_caches[url] = TTLCache(
+                maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL.get(url, DEFAULT_CACHE_TTL)
+            )
+        cache[key] = value
+        _stale_cache[key] = value
+
+
+def _product_event_reader():
+    """
+    쇼핑 검색 응답의 ijson 이벤트를 필드별 리스트로 바로 누적
+    (응답 전체 dict → 상품 dict 리스트를 거치지 않는다)
+    
+    Returns:
+        (result, feed) - result: {"total": int, "columns": {API 필드: [값...]}},
+        feed(prefix, event, value)를 이벤트마다 호출
+    """
+    columns = {field: [] for field in PRODUCT_COLUMNS}
+    result = {"total": 0, "columns": columns}
+    
+    def feed(prefix, event, value):
+        if prefix == "items.item":
+            if event == "start_map":
+                # 누락 필드는 빈 문자열로 남긴다
+                for values in columns.values():
+                    values.append("")
+        elif prefix.startswith("items.item."):
+            values = columns.get(prefix[11:])
+            if values is not None and value is not None and event != "map_key":
+                values[-1] = value
+        elif prefix == "total" and event == "number":
+            result["total"] = int(value)
+    
+    return result, feed
+
+
+def _product_stream_parser():
+    """
+    쇼핑 검색 응답 청크용 ijson push 파서
+    
+    Returns:
+        (result, send, close) - send(chunk)로 응답 청크를 넣고 close() 후 result 완성
+    """
+    result, feed = _product_event_reader()
+    events = ijson.sendable_list()
+    coro = ijson.parse_coro(events, use_float=True)
+    
+    def flush():
+        for event in events:
+            feed(*event)
+        del events[:]
+    
+    def send(chunk: bytes):
+        coro.send(chunk)
+        flush()
+    
+    def close():
+        coro.close()
+        flush()
+    
+    return result, send, close
+
+
+def _retry_delay(attempt: int, response: httpx.Response) -> float:
+    """Retry-After 헤더(초)가 있으면 우선, 없으면 지수 백오프"""
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return float(retry_after)
+    return RETRY_BACKOFF * (2 ** attempt)
+
+
+class _RetryTransport(httpx.HTTPTransport):
+    """429/5xx 응답 재시도 (연결 오류 재시도는 retries 인자로 httpx가 처리)"""
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(MAX_RETRIES):
+            response = super().handle_request(request)
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            response.close()
+            time.sleep(_retry_delay(attempt, response))
+        return super().handle_request(request)
+
+
+class _AsyncRetryTransport(httpx.AsyncHTTPTransport):
+    """_RetryTransport의 비동기 버전"""
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(MAX_RETRIES):
+            response = await super().handle_async_request(request)
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            await response.aclose()
+            await asyncio.sleep(_retry_delay(attempt, response))
+        return await super().handle_async_request(request)
+
+
+def _to_prices(values: list) -> np.ndarray:
+    """가격 문자열 리스트 → int64 배열 (빈 문자열/파싱 실패는 0)"""
+    prices = pd.to_numeric(np.array(values, dtype=object), errors="coerce")
+    return np.nan_to_num(prices, nan=0).astype(np.int64)
+
+
+@functools.lru_cache(maxsize=256)
+def _shopping_category_body(
+    start_date: str,
+    end_date: str,
+    time_unit: str,
+    category_name: str,
+    category_code: str,
+    device: str,
+    gender: str,
+    ages: tuple
+) -> bytes:
+    """쇼핑 카테고리 트렌드 요청 본문 (직렬화된 bytes를 그대로 캐시 키로 사용)"""
+    body = {
+        "startDate": start_date,
+        "endDate": end_date,
+        "timeUnit": time_unit,
+        "category": [{"name": category_name, "param": [category_code]}]
+    }
+    
+    if device:
+        body["device"] = device
+    if gender:
+        body["gender"] = gender
+    if ages:
+        body["ages"] = list(ages)
+    
+    return orjson.dumps(body)
+
+
+@functools.lru_cache(maxsize=32)
+def _month_range(months: int, today: date) -> tuple:
+    """오늘 기준 N개월 전 ~ 오늘 (YYYY-MM-DD 문자열). 날짜가 바뀌면 키도 바뀐다."""
+    start = today - relativedelta(months=months)
+    return start.isoformat(), today.isoformat()
+
+
+def _ttl_cached(fetch):
+    """(url, payload) 기준 TTL 응답 캐시, 네트워크 오류/429·5xx 시 마지막 성공 응답으로 대체"""
+    @functools.wraps(fetch)
+    def wrapper(self, url, payload):
+        key = _cache_key(url, payload)
+        cached = _cache_lookup(url, key)
+        if cached is not None:
+            return cached
+        try:
+            result = fetch(self, url, payload)
+        except (NaverAPIError, httpx.TransportError) as e:
+            # 인증 실패(401/403)·잘못된 요청(4xx)은 오래된 응답으로 가리지 않고 그대로 전달
+            if isinstance(e, NaverAPIError) and e.status_code != 429 and e.status_code < 500:
+                raise
+            with _cache_lock:
+                stale = _stale_cache.get(key)
+            if stale is not None:
+                return stale
+            raise
+        _cache_store(url, key, result)
+        return result
+    return wrapper
+
 
 class NaverDataLabClient:
     """네이버 데이터랩 API 클라이언트"""
@@ -32,19 +281,46 @@ class NaverDataLabClient:
             "X-Naver-Client-Secret": self.client_secret,
             "Content-Type": "application/json"
         }
+        
+        # HTTP/2 클라이언트: 한 연결에서 여러 요청 다중화 + 연결 오류/429/5xx 재시도
+        self.client = httpx.Client(
+            headers=self.headers,
+            timeout=REQUEST_TIMEOUT,
+            transport=_RetryTransport(
+                http2=True,
+                retries=MAX_RETRIES,
+                limits=httpx.Limits(max_connections=10)
+            )
+        )
     
-    def _make_request(self, url: str, body: dict) -> dict:
-        """API 요청 공통 함수"""
+    @_ttl_cached
+    def _post_json(self, url: str, body: Union[dict, bytes]) -> dict:
+        """POST 요청 후 JSON 응답 반환 (캐시 적용)"""
+        data = body if isinstance(body, bytes) else orjson.dumps(body)
+        response = self.client.post(url, content=data)
+        if response.status_code >= 400:
+            raise NaverAPIError(response.status_code, response.text)
+        # 텍스트 디코딩 없이 바이트를 바로 파싱
+        return orjson.loads(response.content)
+    
+    @_ttl_cached
+    def _get_products(self, url: str, params: dict) -> dict:
+        """쇼핑 검색 GET 요청, 응답을 스트리밍 파싱해 필드별 리스트로 반환 (캐시 적용)"""
+        with self.client.stream("GET", url, params=params) as response:
+            if response.status_code >= 400:
+                response.read()  # 에러 본문(response.text)은 메시지용으로 읽어 둔다
+                raise NaverAPIError(response.status_code, response.text)
+            result, send, close = _product_stream_parser()
+            for chunk in response.iter_bytes():  # gzip 응답도 청크 단위로 해제
+                send(chunk)
+            close()
+        return result
+    
+    def _make_request(self, url: str, body: Union[dict, bytes]) -> dict:
+        """API 요청 공통 함수 (body: dict 또는 직렬화된 JSON bytes)"""
         try:
-            response = requests.post(url, headers=self.headers, data=json.dumps(body))
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            error_msg = f"HTTP Error: {e.response.status_code}"
-            if e.response.text:
-                error_msg += f" - {e.response.text}"
-            raise Exception(error_msg)
-        except requests.exceptions.RequestException as e:
+            return self._post_json(url, body)
+        except httpx.TransportError as e:  # 연결 실패/타임아웃
             raise Exception(f"Request Error: {str(e)}")
     
     # ========== 검색어 트렌드 API ==========
@@ -76,40 +352,45 @@ class NaverDataLabClient:
         Returns:
             DataFrame with trend data
         """
-        body = {
-            "startDate": start_date,
-            "endDate": end_date,
-            "timeUnit": time_unit,
-            "keywordGroups": keywords
-        }
-        
-        if device:
-            body["device"] = device
-        if gender:
-            body["gender"] = gender
-        if ages:
-            body["ages"] = ages
+        if not (device or gender or ages):
+            # 필터 없는 기본 요청은 템플릿에 값만 채워 바로 bytes 본문 생성
+            body = _SEARCH_TREND_BODY_TEMPLATE % (
+                start_date.encode(), end_date.encode(), time_unit.encode(), orjson.dumps(keywords)
+            )
+        else:
+            body = {
+                "startDate": start_date,
+                "endDate": end_date,
+                "timeUnit": time_unit,
+                "keywordGroups": keywords
+            }
+            
+            if device:
+                body["device"] = device
+            if gender:
+                body["gender"] = gender
+            if ages:
+                body["ages"] = ages
         
         result = self._make_request(DATALAB_SEARCH_URL, body)
-        return self._parse_search_trend(result)
+        return self._parse_ratio_results(result)
     
-    def _parse_search_trend(self, result: dict) -> pd.DataFrame:
-        """검색어 트렌드 결과 파싱"""
-        all_data = []
+    def _parse_ratio_results(self, result: dict) -> pd.DataFrame:
+        """검색어/쇼핑 트렌드 결과 파싱 (group, period, ratio 컬럼 단위로 수집)"""
+        groups, periods, ratios = [], [], []
         
         for group in result.get("results", []):
-            group_name = group["title"]
+            group_name = group.get("title", "unknown")
             for item in group.get("data", []):
-                all_data.append({
-                    "group": group_name,
-                    "period": item["period"],
-                    "ratio": item["ratio"]
-                })
-        
-        df = pd.DataFrame(all_data)
-        if not df.empty:
-            df["period"] = pd.to_datetime(df["period"])
-        return df
+                groups.append(group_name)
+                periods.append(item["period"])
+                ratios.append(item["ratio"])
+        
+        return pd.DataFrame({
+            "group": groups,
+            "period": pd.to_datetime(periods),
+            "ratio": ratios
+        })
     
     # ========== 쇼핑인사이트 API ==========
     
@@ -140,22 +421,12 @@ class NaverDataLabClient:
         Returns:
             DataFrame with category trend data
         """
-        body = {
-            "startDate": start_date,
-            "endDate": end_date,
-            "timeUnit": time_unit,
-            "category": [{"name": category_name, "param": [category_code]}]
-        }
-        
-        if device:
-            body["device"] = device
-        if gender:
-            body["gender"] = gender
-        if ages:
-            body["ages"] = ages
-        
+        body = _shopping_category_body(
+            start_date, end_date, time_unit, category_name, category_code,
+            device, gender, tuple(ages) if ages else ()
+        )
         result = self._make_request(DATALAB_SHOPPING_URL, body)
-        return self._parse_shopping_trend(result)
+        return self._parse_ratio_results(result)
     
     def get_shopping_keyword_trend(
         self,
@@ -200,32 +471,15 @@ class NaverDataLabClient:
             body["ages"] = ages
         
         result = self._make_request(DATALAB_SHOPPING_KEYWORD_URL, body)
-        return self._parse_shopping_trend(result)
-    
-    def _parse_shopping_trend(self, result: dict) -> pd.DataFrame:
-        """쇼핑 트렌드 결과 파싱"""
-        all_data = []
-        
-        for group in result.get("results", []):
-            group_name = group.get("title", "unknown")
-            for item in group.get("data", []):
-                all_data.append({
-                    "group": group_name,
-                    "period": item["period"],
-                    "ratio": item["ratio"]
-                })
-        
-        df = pd.DataFrame(all_data)
-        if not df.empty:
-            df["period"] = pd.to_datetime(df["period"])
-        return df
+        return self._parse_ratio_results(result)
     
     # ========== 편의 함수 ==========
     
     def compare_keywords(
         self,
         keywords: List[str],
-        months: int = 12
+        months: int = 12,
+        parallel: bool = False
     ) -> pd.DataFrame:
         """
         여러 키워드의 검색 트렌드 간편 비교
@@ -233,18 +487,37 @@ class NaverDataLabClient:
         Args:
             keywords: 비교할 키워드 리스트 (최대 5개)
             months: 조회 기간 (개월)
+            parallel: 키워드별 단일 그룹 요청을 동시에 보냄
+                (ratio가 키워드마다 각자 최대값 100 기준으로 정규화되므로
+                 키워드 간 상대 비교가 필요하면 False 유지)
             
         Returns:
             DataFrame with comparison data
         """
-        end_date = datetime.now().strftime("%Y-%m-%d")
-        start_date = (datetime.now() - timedelta(days=months*30)).strftime("%Y-%m-%d")
+        start_date, end_date = _month_range(months, date.today())
         
+        # 공백 제거 + 순서 유지 중복 제거 (중복 키워드가 그룹 슬롯을 낭비하지 않도록)
+        unique_keywords = list(dict.fromkeys(kw.strip() for kw in keywords if kw and kw.strip()))
+
         keyword_groups = [
-            {"groupName": kw, "keywords": [kw]} 
-            for kw in keywords[:5]  # 최대 5개
+            {"groupName": kw, "keywords": [kw]}
+            for kw in unique_keywords[:5]  # 최대 5개
         ]
         
+        if parallel and len(keyword_groups) > 1:
+            # httpx.Client는 스레드 안전 (HTTP/2 연결 다중화, Limits(max_connections=10)) - 최대 5개 스레드가 공유
+            with ThreadPoolExecutor(max_workers=len(keyword_groups)) as executor:
+                frames = list(executor.map(
+                    lambda group: self.get_search_trend(
+                        keywords=[group],
+                        start_date=start_date,
+                        end_date=end_date,
+                        time_unit="month"
+                    ),
+                    keyword_groups
+                ))
+            return pd.concat(frames, ignore_index=True)
+        
         return self.get_search_trend(
             keywords=keyword_groups,
             start_date=start_date,
@@ -277,6 +550,10 @@ class NaverDataLabClient:
         Returns:
             DataFrame with product data
         """
+        return self._parse_products(self._fetch_products(query, display, start, sort))
+    
+    def _fetch_products(self, query: str, display: int, start: int, sort: str) -> dict:
+        """쇼핑 검색 단일 페이지 조회 (파싱 전, _product_event_reader 결과)"""
         params = {
             "query": query,
             "display": min(display, 100),
@@ -285,55 +562,126 @@ class NaverDataLabClient:
         }
         
         try:
-            response = requests.get(
-                SHOPPING_SEARCH_URL, 
-                headers=self.headers, 
-                params=params
-            )
-            response.raise_for_status()
-            result = response.json()
-            return self._parse_products(result)
-        except requests.exceptions.HTTPError as e:
-            error_msg = f"HTTP Error: {e.response.status_code}"
-            if e.response.text:
-                error_msg += f" - {e.response.text}"
-            raise Exception(error_msg)
-        except requests.exceptions.RequestException as e:
+            return self._get_products(SHOPPING_SEARCH_URL, params)
+        except httpx.TransportError as e:  # 연결 실패/타임아웃
             raise Exception(f"Request Error: {str(e)}")
     
     def _parse_products(self, result: dict) -> pd.DataFrame:
-        """쇼핑 검색 결과 파싱"""
-        items = result.get("items", [])
+        """
+        쇼핑 검색 결과 파싱 (전체 검색 결과 수는 df.attrs["total"])
         
-        products = []
-        for item in items:
-            # HTML 태그 제거
-            title = item.get("title", "").replace("<b>", "").replace("</b>", "")
-            
-            # 가격 파싱 (빈 문자열 처리)
-            lprice = item.get("lprice", "0")
-            hprice = item.get("hprice", "0")
-            lprice = int(lprice) if lprice else 0
-            hprice = int(hprice) if hprice else 0
-            
-            products.append({
-                "title": title,
-                "link": item.get("link", ""),
-                "image": item.get("image", ""),
-                "lprice": lprice,
-                "hprice": hprice,
-                "mall_name": item.get("mallName", ""),
-                "product_id": item.get("productId", ""),
-                "product_type": item.get("productType", ""),
-                "brand": item.get("brand", ""),
-                "maker": item.get("maker", ""),
-                "category1": item.get("category1", ""),
-                "category2": item.get("category2", ""),
-                "category3": item.get("category3", ""),
-                "category4": item.get("category4", ""),
-            })
-        
-        return pd.DataFrame(products)
+        Args:
+            result: _product_event_reader 결과 ({"total", "columns"})
+        """
+        columns = result["columns"]
+        if not columns["title"]:
+            df = pd.DataFrame()
+            df.attrs["total"] = result["total"]
+            return df
+        
+        # 스키마가 고정이므로 컬럼별 dtype을 지정해 생성 (타입 추론 생략)
+        data = {}
+        for field, values in columns.items():
+            if field in PRICE_FIELDS:
+                data[PRODUCT_COLUMNS[field]] = _to_prices(values)
+            else:
+                data[PRODUCT_COLUMNS[field]] = np.array(values, dtype=object)
+        df = pd.DataFrame(data, copy=False)
+        
+        # HTML 태그 제거
+        df["title"] = (
+            df["title"]
+            .str.replace("<b>", "", regex=False)
+            .str.replace("</b>", "", regex=False)
+        )
+        
+        df.attrs["total"] = result["total"] or len(df)
+        return df
+    
+    async def _fetch_products_async(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        display: int,
+        start: int,
+        sort: str
+    ) -> dict:
+        """쇼핑 검색 단일 페이지 비동기 조회 (파싱 전)"""
+        params = {
+            "query": query,
+            "display": min(display, 100),
+            "start": start,
+            "sort": sort
+        }
+        
+        key = _cache_key(SHOPPING_SEARCH_URL, params)
+        result = _cache_lookup(SHOPPING_SEARCH_URL, key)
+        if result is None:
+            async with semaphore:
+                async with client.stream("GET", SHOPPING_SEARCH_URL, params=params) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        raise NaverAPIError(response.status_code, response.text)
+                    result, send, close = _product_stream_parser()
+                    async for chunk in response.aiter_bytes():
+                        send(chunk)
+                    close()
+            _cache_store(SHOPPING_SEARCH_URL, key, result)
+        return result
+    
+    async def _fetch_all_products_async(
+        self,
+        query: str,
+        starts: range,
+        sort: str
+    ) -> List[dict]:
+        """여러 페이지 동시 조회 (HTTP/2 단일 연결 다중화, 페이지 순서 유지)"""
+        semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+        async with httpx.AsyncClient(
+            headers=self.headers,
+            timeout=REQUEST_TIMEOUT,
+            transport=_AsyncRetryTransport(http2=True, retries=MAX_RETRIES)
+        ) as client:
+            return await asyncio.gather(*[
+                self._fetch_products_async(client, semaphore, query, 100, start, sort)
+                for start in starts
+            ])
+    
+    def _fetch_product_pages(self, query: str, max_results: int, sort: str) -> List[dict]:
+        """
+        여러 페이지 조회 (파싱 전 페이지별 결과 리스트)
+        첫 페이지의 전체 결과 수(total)로 필요한 페이지만 계산한 뒤,
+        나머지 페이지 요청은 동시에 보내고 결과는 페이지 순서대로 반환한다.
+        """
+        max_results = min(max_results, 1000)  # API 한도
+        
+        first = self._fetch_products(query, 100, 1, sort)
+        count = len(first["columns"]["title"])
+        if count == 0:
+            return []
+        pages = [first]
+        
+        # 마지막 페이지이거나 전체 결과 수가 한 페이지 이내면 추가 요청 없음
+        max_results = min(max_results, first["total"] or max_results)
+        starts = range(101, max_results, 100)
+        if count < 100 or not starts:
+            return pages
+        
+        try:
+            results = asyncio.run(self._fetch_all_products_async(query, starts, sort))
+        except httpx.TransportError as e:
+            raise Exception(f"Request Error: {str(e)}")
+        
+        for result in results:
+            count = len(result["columns"]["title"])
+            if count == 0:
+                break
+            pages.append(result)
+            if count < 100:
+                break
+        
+        return pages
     
     def search_all_products(
         self,
@@ -352,23 +700,16 @@ class NaverDataLabClient:
         Returns:
             DataFrame with all product data
         """
-        all_products = []
-        max_results = min(max_results, 1000)  # API 한도
+        pages = self._fetch_product_pages(query, max_results, sort)
+        if not pages:
+            return pd.DataFrame()
         
-        for start in range(1, max_results, 100):
-            df = self.search_products(
-                query=query,
-                display=100,
-                start=start,
-                sort=sort
-            )
-            if df.empty:
-                break
-            all_products.append(df)
-        
-        if all_products:
-            return pd.concat(all_products, ignore_index=True)
-        return pd.DataFrame()
+        # 페이지별 필드 리스트를 이어 붙여 DataFrame은 한 번만 생성 (concat 복사 없음)
+        columns = {
+            field: list(chain.from_iterable(page["columns"][field] for page in pages))
+            for field in PRODUCT_COLUMNS
+        }
+        return self._parse_products({"total": pages[0]["total"], "columns": columns})
     
     def get_price_stats(self, query: str, max_results: int = 500) -> dict:
         """
@@ -381,31 +722,40 @@ class NaverDataLabClient:
         Returns:
             dict with price statistics
         """
-        df = self.search_all_products(query, max_results, sort="sim")
-        
-        if df.empty:
-            return {}
+        # DataFrame 없이 필요한 세 필드만 페이지별 리스트에서 수집
+        prices, malls, brands = [], [], []
+        for result in self._fetch_product_pages(query, max_results, "sim"):
+            columns = result["columns"]
+            prices.extend(columns["lprice"])
+            malls.extend(columns["mallName"])
+            brands.extend(columns["brand"])
         
         # 최저가가 0인 상품 제외
-        df_valid = df[df["lprice"] > 0]
+        prices = _to_prices(prices)
+        valid = prices > 0
+        prices = prices[valid]
         
-        if df_valid.empty:
+        if len(prices) == 0:
             return {}
         
+        # 분위수는 한 번의 정렬로 계산 (pandas와 같은 linear 보간)
+        q0, q1, q2, q3, q4 = np.quantile(prices, [0, 0.25, 0.5, 0.75, 1.0])
+        std = prices.std(ddof=1) if len(prices) > 1 else np.nan
+        
         return {
             "query": query,
-            "total_products": len(df_valid),
-            "min_price": int(df_valid["lprice"].min()),
-            "max_price": int(df_valid["lprice"].max()),
-            "avg_price": int(df_valid["lprice"].mean()),
-            "median_price": int(df_valid["lprice"].median()),
-            "std_price": int(df_valid["lprice"].std()),
-            "top_malls": df_valid["mall_name"].value_counts().head(10).to_dict(),
-            "top_brands": df_valid["brand"].value_counts().head(10).to_dict(),
+            "total_products": len(prices),
+            "min_price": int(q0),
+            "max_price": int(q4),
+            "avg_price": int(prices.mean()),
+            "median_price": int(q2),
+            "std_price": int(std) if not np.isnan(std) else 0,
+            "top_malls": dict(Counter(compress(malls, valid)).most_common(10)),
+            "top_brands": dict(Counter(compress(brands, valid)).most_common(10)),
             "price_distribution": {
-                "q1": int(df_valid["lprice"].quantile(0.25)),
-                "q2": int(df_valid["lprice"].quantile(0.50)),
-                "q3": int(df_valid["lprice"].quantile(0.75)),
+                "q1": int(q1),
+                "q2": int(q2),
+                "q3": int(q3),
             }
         }
 
@@ -640,6 +990,39 @@ SHOPPING_SUBCATEGORIES = {
     },
 }
 
+# (대분류, 세부 카테고리) → 코드 평탄화 조회 테이블 (읽기 전용)
+# 코드 조회는 SHOPPING_SUBCAT_FLAT[(대분류, 세부)] 한 번의 해시로 처리
+SHOPPING_SUBCAT_FLAT = MappingProxyType({
+    (parent, child): code
+    for parent, subcats in SHOPPING_SUBCATEGORIES.items()
+    for child, code in subcats.items()
+})
+
+
+@functools.lru_cache(maxsize=1)
+def _get_category_maps():
+    """
+    세부 카테고리 코드 ↔ "대분류 > 세부" 이름 양방향 조회 테이블 (최초 호출 시 1회 생성)
+    같은 코드가 여러 대분류에 있으면 코드 → 이름은 먼저 정의된 항목을 사용
+    """
+    code_to_name = {}
+    name_to_code = {}
+    for (parent, child), code in SHOPPING_SUBCAT_FLAT.items():
+        name = f"{parent} > {child}"
+        code_to_name.setdefault(code, name)
+        name_to_code[name] = code
+    return MappingProxyType(code_to_name), MappingProxyType(name_to_code)
+
+
+def get_category_name(code: str) -> Optional[str]:
+    """카테고리 코드 → "대분류 > 세부" 이름"""
+    return _get_category_maps()[0].get(code)
+
+
+def get_category_code(name: str) -> Optional[str]:
+    """"대분류 > 세부" 이름 → 카테고리 코드"""
+    return _get_category_maps()[1].get(name)
+
 
 # 사용 예시
 if __name__ == "__main__":
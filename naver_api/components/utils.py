@@ -59,8 +59,8 @@ def cached_shopping_trend(cat_name, cat_code, start_date, end_date, time_unit, d
         ages=list(ages_tuple) if ages_tuple else None
     )
 
-@st.cache_data(ttl=600, show_spinner=False)
-def cached_product_search(query, max_results, sort):
+@st.cache_data(ttl=600, max_entries=128, show_spinner=False)
+def cached_product_search(query, max_results, sort="sim"):
     """상품 검색 API 캐싱"""
     client = get_datalab_client()
     return client.search_all_products(query=query, max_results=max_results, sort=sort)
@@ -1,13 +1,19 @@
 import os
 import streamlit as st
 
+# Streamlit Secrets는 모듈 로드 시 한 번만 읽어 dict로 보관
+try:
+    _SECRETS = dict(st.secrets)
+except FileNotFoundError:  # secrets.toml 없음
+    _SECRETS = {}
+
 # Streamlit Cloud Secret 또는 로컬 환경변수 우선 사용
 def get_secret(key, default):
     # 1. Streamlit Secrets 확인 (Cloud 배포용)
-    if key in st.secrets:
-        return st.secrets[key]
+    if key in _SECRETS:
+        return _SECRETS[key]
     # 2. 환경변수 확인
-    return os.getenv(key, default)
+    return os.environ.get(key, default)
 
 # 네이버 데이터랩 API 키
 NAVER_CLIENT_ID = get_secret("NAVER_CLIENT_ID", "")
@@ -213,8 +213,8 @@ def cached_shopping_trend(_client, cat_name, cat_code, start_date, end_date, tim
         ages=list(ages_tuple) if ages_tuple else None
     )
 
-@st.cache_data(ttl=600, show_spinner=False)
-def cached_product_search(_client, query, max_results, sort):
+@st.cache_data(ttl=600, max_entries=128, show_spinner=False)
+def cached_product_search(_client, query, max_results, sort="sim"):
     """상품 검색 API 캐싱"""
     return _client.search_all_products(query=query, max_results=max_results, sort=sort)
 
@@ -684,7 +684,7 @@ with tab2:
     st.markdown("네이버 쇼핑에서 각 카테고리의 클릭 트렌드를 분석합니다.")
     
     # SUBCATEGORIES 임포트
-    from api_client import SHOPPING_SUBCATEGORIES
+    from api_client import SHOPPING_SUBCATEGORIES, SHOPPING_SUBCAT_FLAT
     
     # 분석 모드 선택
     category_mode = st.radio(
@@ -726,7 +726,7 @@ with tab2:
                 max_selections=3
             )
             
-            category_pairs = [(name, subcats[name]) for name in selected_subs]
+            category_pairs = [(name, SHOPPING_SUBCAT_FLAT[(main_category, name)]) for name in selected_subs]
         else:
             category_pairs = []
             st.warning("하위 카테고리가 없습니다.")
@@ -846,7 +846,7 @@ with tab3:
     if st.button("📦 상품 분석", type="primary", key="product_analyze"):
         with st.spinner(f"'{product_query}' 상품 분석 중... (최대 {max_products}개)"):
             try:
-                df = client.search_all_products(query=product_query, max_results=max_products, sort=sort_option)
+                df = cached_product_search(client, query=product_query, max_results=max_products, sort=sort_option)
                 if not df.empty:
                     df_valid = df[df["lprice"] > 0]
                     st.session_state.analysis_results["tab3"] = {
@@ -1192,7 +1192,8 @@ with tab4:
                     price_stats = []
                     
                     for brand in brands:
-                        df = client.search_all_products(
+                        df = cached_product_search(
+                            client,
                             query=brand,
                             max_results=200,
                             sort="sim"
@@ -1369,7 +1370,7 @@ with tab6:
         if st.button("🔗 연관 브랜드 분석", type="primary", key="related_kw"):
             with st.spinner(f"'{seed_keyword}' 분석 중..."):
                 try:
-                    df = client.search_all_products(query=seed_keyword, max_results=300, sort="sim")
+                    df = cached_product_search(client, query=seed_keyword, max_results=300, sort="sim")
                     if not df.empty:
                         # 전체 브랜드 (빈 값 제외)
                         all_brands = df["brand"].value_counts()
@@ -1650,7 +1651,8 @@ with tab6:
                     keyword_df = search_ad_client.get_keyword_stats([target_product])
                     
                     # 상품 검색으로 가격 정보 수집
-                    product_df = client.search_all_products(
+                    product_df = cached_product_search(
+                        client,
                         query=f"{exclude_brand} {target_product}" if exclude_brand else target_product,
                         max_results=300,
                         sort="sim"
@@ -1818,7 +1820,7 @@ with tab7:
         if st.button("📊 시장 규모 분석", type="primary", key="size_btn"):
             with st.spinner(f"'{target_market}' 시장 규모 분석 중..."):
                 try:
-                    df = client.search_all_products(query=target_market, max_results=500)
+                    df = cached_product_search(client, query=target_market, max_results=500)
                     trend_df = client.get_search_trend(
                         keywords=[{"groupName":target_market,"keywords":[target_market]}], 
                         start_date=(datetime.now()-timedelta(days=365)).strftime("%Y-%m-%d"), 
@@ -1895,7 +1897,7 @@ with tab7:
         if st.button("⚔️ 경쟁 강도 분석", type="primary", key="comp_btn"):
             with st.spinner(f"'{target_market}' 경쟁 강도 분석 중..."):
                 try:
-                    df = client.search_all_products(query=target_market, max_results=500)
+                    df = cached_product_search(client, query=target_market, max_results=500)
                     if not df.empty:
                         df_v = df[df["lprice"]>0]
                         st.session_state.analysis_results["tab7_comp"] = {"df_v":df_v, "market":target_market}
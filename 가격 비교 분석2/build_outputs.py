@@ -1,18 +1,40 @@
 from __future__ import annotations
 
-import math
 import re
-from collections import Counter
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-from scipy.stats import kendalltau, linregress, spearmanr
+from scipy.special import stdtr
+from scipy.stats import kendalltau
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
 SEGMENT_BASE = "unit_price"  # "unit_price" or "log_unit_price"
+WRITE_CLEAN_LONG_CSV = False  # dashboards load clean_long.parquet; the CSV is only written without pyarrow
+# numba kernels JIT-compile for ~20 s on a cold cache; the pandas path handles 1M rows in ~0.3 s
+NUMBA_MIN_ROWS = 1_000_000
 PRICE_BAND_QUANTILES = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
 PRICE_BAND_LABELS = ["P0-20", "P20-40", "P40-60", "P60-80", "P80-100"]
 
+TOKEN_SPLIT_PATTERN = re.compile(r"[^0-9a-zA-Z가-힣]+")
+SHEETS_PATTERN = re.compile(r"(\d+)\s*매")
+UNITS_PATTERNS = [re.compile(r"(\d+)\s*개"), re.compile(r"(\d+)\s*팩"), re.compile(r"[xX]\s*(\d+)")]
+
 STOPWORDS = {
     "패드",
     "대용량",
@@ -33,6 +55,28 @@ STOPWORDS = {
 }
 
 
+def write_output(
+    frame: pd.DataFrame,
+    path: Path,
+    columns: list[str] | None = None,
+    rows: pd.Series | None = None,
+    csv: bool = True,
+) -> None:
+    if HAS_PYARROW:
+        table = pa.Table.from_pandas(frame, columns=columns, preserve_index=False)
+        if rows is not None:
+            table = table.filter(pa.array(rows.to_numpy(dtype=bool)))
+        if csv:
+            pacsv.write_csv(table, path, write_options=pacsv.WriteOptions(quoting_style="needed"))
+        pq.write_table(table, path.with_suffix(".parquet"), compression="zstd", row_group_size=256_000)
+    else:
+        if rows is not None:
+            frame = frame[rows]
+        if columns is not None:
+            frame = frame[columns]
+        frame.to_csv(path, index=False)
+
+
 def load_inputs() -> pd.DataFrame:
     input_dir = Path("input")
     files = sorted(input_dir.glob("*.csv")) if input_dir.exists() else []
@@ -42,68 +86,188 @@ def load_inputs() -> pd.DataFrame:
         raise FileNotFoundError("No input CSV files found in ./input or current directory.")
     frames = []
     for csv_path in files:
-        frame = pd.read_csv(csv_path)
+        frame = pd.read_csv(csv_path, engine="pyarrow" if HAS_PYARROW else "c")
         frame["source_file"] = csv_path.name
         frames.append(frame)
     return pd.concat(frames, ignore_index=True)
 
 
-def extract_sheets_per_unit(name: str) -> float:
-    if pd.isna(name):
-        return np.nan
-    match = re.search(r"(\d+)\s*매", str(name))
-    return float(match.group(1)) if match else np.nan
+def extract_sheets_per_unit(names: pd.Series) -> pd.Series:
+    names = names.where(names.isna(), names.astype(str))
+    return names.str.extract(SHEETS_PATTERN, expand=False).astype(float)
 
 
-def extract_units(name: str) -> int:
-    if pd.isna(name):
-        return 1
-    text = str(name)
-    for pattern in (r"(\d+)\s*개", r"(\d+)\s*팩", r"[xX]\s*(\d+)"):
-        match = re.search(pattern, text)
-        if match:
-            return int(match.group(1))
-    return 1
+def extract_units(names: pd.Series) -> pd.Series:
+    names = names.where(names.isna(), names.astype(str))
+    units = pd.Series(np.nan, index=names.index)
+    for pattern in UNITS_PATTERNS:
+        units = units.fillna(pd.to_numeric(names.str.extract(pattern, expand=False)))
+    return units.fillna(1).astype(np.int64)
 
 
 def normalize_category(df: pd.DataFrame) -> pd.Series:
-    category2 = df.get("category2", pd.Series("", index=df.index)).fillna("").astype(str).str.strip()
-    category1 = df.get("category1", pd.Series("", index=df.index)).fillna("").astype(str).str.strip()
-    group = category2.copy()
-    group[group == ""] = category1[group == ""]
-    group = group.replace("", np.nan)
-    return group
+    # category2 first, falling back to category1; missing columns are skipped instead of filled with ""
+    levels = [df[col].fillna("").astype(str).str.strip() for col in ("category2", "category1") if col in df.columns]
+    if not levels:
+        return pd.Series(np.nan, index=df.index, dtype="object")
+    group = levels[0]
+    for fallback in levels[1:]:
+        group = group.mask(group.eq(""), fallback)
+    return group.mask(group.eq(""))
+
+
+if HAS_NUMBA:
+
+    @njit(parallel=True, cache=True)
+    def _mad_sorted_groups(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        out = np.empty(len(starts) - 1)
+        for g in prange(len(starts) - 1):
+            segment = values[starts[g] : starts[g + 1]]
+            segment = segment[~np.isnan(segment)]
+            if segment.size == 0:
+                out[g] = np.nan
+                continue
+            out[g] = np.median(np.abs(segment - np.median(segment)))
+        return out
+
+    @njit(parallel=True, cache=True)
+    def _quantiles_sorted_groups(values: np.ndarray, starts: np.ndarray, qs: np.ndarray) -> np.ndarray:
+        out = np.full((len(starts) - 1, len(qs)), np.nan)
+        for g in prange(len(starts) - 1):
+            segment = values[starts[g] : starts[g + 1]]
+            segment = segment[~np.isnan(segment)]
+            n = segment.size
+            if n == 0:
+                continue
+            # linear interpolation as pandas: only the order statistics next to each q are placed
+            positions = qs * (n - 1)
+            lower = np.floor(positions).astype(np.int64)
+            upper = np.minimum(lower + 1, n - 1)
+            segment = np.partition(segment, np.unique(np.concatenate((lower, upper))))
+            for k in range(len(qs)):
+                frac = positions[k] - lower[k]
+                out[g, k] = segment[lower[k]]
+                if frac > 0:
+                    out[g, k] += (segment[upper[k]] - segment[lower[k]]) * frac
+        return out
+
+
+def _sorted_group_starts(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(codes, kind="stable")
+    starts = np.searchsorted(codes[order], np.arange(codes.max(initial=-1) + 2))
+    return order, starts
+
+
+def mad_by_group(values: pd.Series, group_ids: pd.Series) -> pd.Series:
+    if not HAS_NUMBA or len(values) < NUMBA_MIN_ROWS:
+        median = values.groupby(group_ids).transform("median")
+        return (values - median).abs().groupby(group_ids).transform("median")
+    codes = group_ids.to_numpy(dtype=float)
+    in_group = np.flatnonzero(codes >= 0)
+    codes = codes[in_group].astype(np.intp)
+    order, starts = _sorted_group_starts(codes)
+    mad = _mad_sorted_groups(values.to_numpy(dtype=float)[in_group[order]], starts)
+    result = np.full(len(values), np.nan)
+    result[in_group] = mad[codes]
+    return pd.Series(result, index=values.index)
 
 
 def compute_price_band(df: pd.DataFrame, group_cols: list[str], value_col: str) -> pd.Series:
-    output = pd.Series(index=df.index, dtype="object")
-    for _, idx in df.groupby(group_cols).groups.items():
-        values = df.loc[idx, value_col]
-        valid = values.dropna()
-        if valid.size < 2:
-            continue
-        quantiles = valid.quantile(PRICE_BAND_QUANTILES).to_numpy()
-        quantiles = np.maximum.accumulate(quantiles)
-        array = values.to_numpy()
-        mask = ~pd.isna(array)
-        band_idx = np.searchsorted(quantiles, array[mask], side="right") - 1
-        band_idx = np.clip(band_idx, 0, len(PRICE_BAND_LABELS) - 1)
-        output.loc[np.asarray(idx)[mask]] = [PRICE_BAND_LABELS[i] for i in band_idx]
-    return output
-
-
-def tokenize(text: str) -> list[str]:
-    if pd.isna(text):
-        return []
-    cleaned = re.sub(r"[^0-9a-zA-Z가-힣]+", " ", str(text).lower())
-    tokens = []
-    for token in cleaned.split():
-        if token in STOPWORDS:
-            continue
-        if len(token) < 2:
-            continue
-        tokens.append(token)
-    return tokens
+    if df.empty:
+        return pd.Series(index=df.index, dtype="object")
+    # dropna=False keeps rows with a missing category in their own group, as .groups did
+    group_ids = df.groupby(group_cols, dropna=False, observed=True).ngroup().to_numpy()
+    values = df[value_col].to_numpy(dtype=float)
+
+    if HAS_NUMBA and len(values) >= NUMBA_MIN_ROWS:
+        order, starts = _sorted_group_starts(group_ids)
+        qs = np.asarray(PRICE_BAND_QUANTILES, dtype=float)
+        edges = _quantiles_sorted_groups(values[order], starts, qs)
+        counts = np.bincount(group_ids, weights=~np.isnan(values), minlength=len(starts) - 1)
+    else:
+        grouped = df[value_col].groupby(group_ids)
+        edges = grouped.quantile(PRICE_BAND_QUANTILES).unstack().to_numpy()
+        counts = grouped.count().to_numpy()
+    edges = np.maximum.accumulate(edges, axis=1)[group_ids]
+    mask = (counts[group_ids] >= 2) & ~np.isnan(values)
+
+    # same as searchsorted(edges, value, side="right") - 1 clipped to the last band
+    band_idx = (values[:, None] >= edges[:, 1:-1]).sum(axis=1)
+    labels = np.asarray(PRICE_BAND_LABELS, dtype=object)[band_idx]
+    return pd.Series(np.where(mask, labels, np.nan), index=df.index, dtype="object")
+
+
+def grouped_comoments(frame: pd.DataFrame, group_cols: list[str], x_col: str, y_col: str) -> pd.DataFrame:
+    grouped = frame.groupby(group_cols, observed=True)
+    dx = frame[x_col] - grouped[x_col].transform("mean")
+    dy = frame[y_col] - grouped[y_col].transform("mean")
+    terms = pd.DataFrame({"sxx": dx * dx, "syy": dy * dy, "sxy": dx * dy})
+    return terms.groupby([frame[col] for col in group_cols], observed=True).sum()
+
+
+def rank_price_correlations(df: pd.DataFrame, group_cols: list[str]) -> pd.DataFrame:
+    all_groups = df.groupby(group_cols, observed=True).size().index
+    pairs = df.loc[
+        df["page_rank"].notna() & df["log_unit_price"].notna(),
+        group_cols + ["page_rank", "log_unit_price"],
+    ]
+    pair_groups = pairs.groupby(group_cols, observed=True)
+    n = pair_groups.size().reindex(all_groups, fill_value=0)
+    enough = n >= 2
+
+    # spearman: pearson on average ranks, p from Student t with n - 2 dof (as scipy)
+    pairs = pairs.assign(
+        rank_x=pair_groups["page_rank"].rank(), rank_y=pair_groups["log_unit_price"].rank()
+    )
+    ranked = grouped_comoments(pairs, group_cols, "rank_x", "rank_y").reindex(all_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spearman = (ranked["sxy"] / np.sqrt(ranked["sxx"] * ranked["syy"])).clip(-1, 1)
+        spearman = spearman.where((ranked["sxx"] > 0) & (ranked["syy"] > 0))
+        dof = n - 2
+        t_stat = spearman * np.sqrt((dof / ((spearman + 1.0) * (1.0 - spearman))).clip(lower=0))
+        spearman_p = 2 * stdtr(dof, -np.abs(t_stat))
+
+    # linregress(log_unit_price, page_rank): slope and r from the same co-moments
+    raw = grouped_comoments(pairs, group_cols, "log_unit_price", "page_rank").reindex(all_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (raw["sxy"] / raw["sxx"]).where(raw["sxx"] > 0)
+        r = (raw["sxy"] / np.sqrt(raw["sxx"] * raw["syy"])).clip(-1, 1)
+        r = r.where((raw["sxx"] > 0) & (raw["syy"] > 0))
+
+    # pairs are already NaN-free, so kendalltau runs on plain slices and the results are set in one go
+    x = pairs["page_rank"].to_numpy()
+    y = pairs["log_unit_price"].to_numpy()
+    kendall_keys = []
+    kendall_values = []
+    for key, positions in pair_groups.indices.items():
+        if len(positions) >= 2:
+            kend = kendalltau(x[positions], y[positions])
+            kendall_keys.append(key)
+            kendall_values.append((kend.correlation, kend.pvalue))
+    kendall = np.full((len(all_groups), 2), np.nan)
+    if kendall_keys:
+        kendall[all_groups.get_indexer(kendall_keys)] = kendall_values
+    kendall = pd.DataFrame(kendall, index=all_groups, columns=["kendall_corr", "kendall_p"])
+
+    corr_rank_price = pd.DataFrame(
+        {
+            "n": n,
+            "spearman_corr": spearman.where(enough),
+            "spearman_p": spearman_p.where(enough),
+            "kendall_corr": kendall["kendall_corr"],
+            "kendall_p": kendall["kendall_p"],
+            "slope": slope.where(enough),
+            "r2": (r ** 2).where(enough),
+        },
+        index=all_groups,
+    )
+    return corr_rank_price.reset_index()
+
+
+def tokenize(names: pd.Series) -> pd.Series:
+    cleaned = names.dropna().astype(str).str.lower().str.replace(TOKEN_SPLIT_PATTERN, " ", regex=True)
+    tokens = cleaned.str.split().explode()
+    return tokens[(tokens.str.len() >= 2) & ~tokens.isin(STOPWORDS)]
 
 
 def main() -> None:
@@ -116,37 +280,39 @@ def main() -> None:
 
     df["category_group"] = normalize_category(df)
 
-    df["sheets_per_unit"] = df["product_name"].apply(extract_sheets_per_unit)
-    df["units"] = df["product_name"].apply(extract_units)
+    df["sheets_per_unit"] = extract_sheets_per_unit(df["product_name"])
+    df["units"] = extract_units(df["product_name"])
     df["total_sheets"] = df["sheets_per_unit"] * df["units"]
-    df["has_sheets"] = df["sheets_per_unit"].notna()
-    df["is_unrealistic_sheets"] = df["total_sheets"].notna() & (
-        (df["total_sheets"] < 10) | (df["total_sheets"] > 1000)
-    )
-    df["is_valid_sheets"] = df["total_sheets"].notna() & (~df["is_unrealistic_sheets"]) & (
-        df["total_sheets"] > 0
-    )
-
-    df["unit_price"] = np.where(df["total_sheets"] > 0, df["price"] / df["total_sheets"], np.nan)
-    df["log_unit_price"] = np.where(
-        (df["unit_price"] > 0) & (df["is_valid_sheets"]),
-        np.log(df["unit_price"]),
-        np.nan,
-    )
+    total_sheets = df["total_sheets"].to_numpy(dtype=float)
+    price = df["price"].to_numpy(dtype=float)
+    has_total = ~np.isnan(total_sheets)
+    positive = total_sheets > 0
+    unrealistic = has_total & ((total_sheets < 10) | (total_sheets > 1000))
+    valid = has_total & ~unrealistic & positive
+    df["has_sheets"] = df["sheets_per_unit"].notna().to_numpy()
+    df["is_unrealistic_sheets"] = unrealistic
+    df["is_valid_sheets"] = valid
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit_price = np.where(positive, price / total_sheets, np.nan)
+        df["unit_price"] = unit_price
+        df["log_unit_price"] = np.where(valid & (unit_price > 0), np.log(unit_price), np.nan)
+
+    # low-cardinality keys as categoricals so every groupby hashes small int codes
+    for col in ["week_start_date", "category_group", "brand"]:
+        df[col] = df[col].astype("category")
 
     group_cols = ["week_start_date", "category_group"]
+    group_ids = df.groupby(group_cols, observed=True).ngroup()
+    log_by_group = df["log_unit_price"].groupby(group_ids)
 
-    mean_log = df.groupby(group_cols)["log_unit_price"].transform("mean")
-    std_log = df.groupby(group_cols)["log_unit_price"].transform(lambda x: x.std(ddof=0))
+    mean_log = log_by_group.transform("mean")
+    std_log = log_by_group.transform("std", ddof=0)
     std_log = std_log.where(std_log > 0)
     df["z_log"] = (df["log_unit_price"] - mean_log) / std_log
 
-    median_log = df.groupby(group_cols)["log_unit_price"].transform("median")
-    mad_log = df.groupby(group_cols)["log_unit_price"].transform(
-        lambda x: np.median(np.abs(x.dropna() - np.median(x.dropna())))
-        if x.dropna().size > 0
-        else np.nan
-    )
+    median_log = log_by_group.transform("median")
+    mad_log = mad_by_group(df["log_unit_price"], group_ids)
     mad_log = mad_log.where(mad_log > 0)
     df["robust_z"] = (df["log_unit_price"] - median_log) / (1.4826 * mad_log)
 
@@ -154,14 +320,9 @@ def main() -> None:
         raise ValueError("SEGMENT_BASE must be 'unit_price' or 'log_unit_price'.")
     segment_col = SEGMENT_BASE
     df["_segment_value"] = df[segment_col].where(df["is_valid_sheets"])
-    quantiles = (
-        df["_segment_value"]
-        .groupby([df[col] for col in group_cols])
-        .quantile([0.5, 0.85])
-        .unstack()
-        .rename(columns={0.5: "p50", 0.85: "p85"})
-    )
-    df = df.join(quantiles, on=group_cols)
+    segment_by_group = df["_segment_value"].groupby(group_ids)
+    df["p50"] = segment_by_group.transform("quantile", 0.5)
+    df["p85"] = segment_by_group.transform("quantile", 0.85)
     df["segment"] = np.select(
         [
             df["_segment_value"].notna() & df["p50"].notna() & (df["_segment_value"] <= df["p50"]),
@@ -176,34 +337,35 @@ def main() -> None:
         default=pd.NA,
     )
 
-    df["price_band"] = compute_price_band(df, group_cols, "_segment_value")
-
-    rank_bucket_4 = []
-    for rank in df["page_rank"].fillna(-1):
-        if 1 <= rank <= 10:
-            rank_bucket_4.append("1-10")
-        elif 11 <= rank <= 20:
-            rank_bucket_4.append("11-20")
-        elif 21 <= rank <= 50:
-            rank_bucket_4.append("21-50")
-        elif 51 <= rank <= 100:
-            rank_bucket_4.append("51-100")
-        else:
-            rank_bucket_4.append("101+")
-    df["rank_bucket_4"] = rank_bucket_4
-
-    quantiles_iqr = df.groupby(group_cols)["log_unit_price"].quantile([0.25, 0.75]).unstack()
-    quantiles_iqr = quantiles_iqr.rename(columns={0.25: "q1", 0.75: "q3"})
-    df = df.join(quantiles_iqr, on=group_cols)
-    df["iqr"] = df["q3"] - df["q1"]
-    df["lower_bound"] = df["q1"] - 1.5 * df["iqr"]
-    df["upper_bound"] = df["q3"] + 1.5 * df["iqr"]
-    df["is_outlier_iqr"] = (
-        df["log_unit_price"].notna()
-        & df["lower_bound"].notna()
-        & df["upper_bound"].notna()
-        & ((df["log_unit_price"] < df["lower_bound"]) | (df["log_unit_price"] > df["upper_bound"]))
+    df["price_band"] = compute_price_band(df, group_cols, "_segment_value").astype("category")
+
+    rank = df["page_rank"]
+    df["rank_bucket_4"] = np.select(
+        [
+            rank.between(1, 10),
+            rank.between(11, 20),
+            rank.between(21, 50),
+            rank.between(51, 100),
+        ],
+        ["1-10", "11-20", "21-50", "51-100"],
+        default="101+",
     )
+    df["rank_bucket_4"] = df["rank_bucket_4"].astype("category")
+
+    # one quantile pass for both quartiles; the extra NaN row serves rows without a group
+    quartiles = log_by_group.quantile([0.25, 0.75]).unstack().to_numpy()
+    quartiles = np.vstack([quartiles, [np.nan, np.nan]])
+    q1, q3 = quartiles[group_ids.fillna(len(quartiles) - 1).to_numpy(dtype=np.intp)].T
+    iqr = q3 - q1
+    lower_bound = q1 - 1.5 * iqr
+    upper_bound = q3 + 1.5 * iqr
+    log_unit_price = df["log_unit_price"].to_numpy()
+    df["q1"] = q1
+    df["q3"] = q3
+    df["iqr"] = iqr
+    df["lower_bound"] = lower_bound
+    df["upper_bound"] = upper_bound
+    df["is_outlier_iqr"] = (log_unit_price < lower_bound) | (log_unit_price > upper_bound)
 
     df = df.drop(columns=["_segment_value"])
 
@@ -211,7 +373,7 @@ def main() -> None:
     output_dir.mkdir(parents=True, exist_ok=True)
 
     clean_long_path = output_dir / "clean_long.csv"
-    df.to_csv(clean_long_path, index=False)
+    write_output(df, clean_long_path, csv=WRITE_CLEAN_LONG_CSV)
 
     scatter_cols = [
         "week_start_date",
@@ -227,12 +389,11 @@ def main() -> None:
         "segment",
         "is_valid_sheets",
     ]
-    positioning_scatter = df[scatter_cols].copy()
-    positioning_scatter.to_csv(output_dir / "positioning_scatter.csv", index=False)
+    write_output(df, output_dir / "positioning_scatter.csv", columns=scatter_cols)
 
     positioning_summary = (
         df[df["is_valid_sheets"]]
-        .groupby(group_cols + ["rank_bucket_4"])["unit_price"]
+        .groupby(group_cols + ["rank_bucket_4"], observed=True)["unit_price"]
         .agg(
             item_count="count",
             median="median",
@@ -242,54 +403,19 @@ def main() -> None:
         .reset_index()
     )
     positioning_summary["iqr"] = positioning_summary["q3"] - positioning_summary["q1"]
-    positioning_summary.to_csv(output_dir / "positioning_summary.csv", index=False)
-
-    corr_rows = []
-    for (week, category), group in df.groupby(group_cols):
-        subset = group[["page_rank", "log_unit_price"]].dropna()
-        n = len(subset)
-        if n < 2:
-            corr_rows.append(
-                {
-                    "week_start_date": week,
-                    "category_group": category,
-                    "n": n,
-                    "spearman_corr": np.nan,
-                    "spearman_p": np.nan,
-                    "kendall_corr": np.nan,
-                    "kendall_p": np.nan,
-                    "slope": np.nan,
-                    "r2": np.nan,
-                }
-            )
-            continue
-        spear = spearmanr(subset["page_rank"], subset["log_unit_price"], nan_policy="omit")
-        kend = kendalltau(subset["page_rank"], subset["log_unit_price"], nan_policy="omit")
-        lin = linregress(subset["log_unit_price"], subset["page_rank"])
-        corr_rows.append(
-            {
-                "week_start_date": week,
-                "category_group": category,
-                "n": n,
-                "spearman_corr": spear.correlation,
-                "spearman_p": spear.pvalue,
-                "kendall_corr": kend.correlation,
-                "kendall_p": kend.pvalue,
-                "slope": lin.slope,
-                "r2": lin.rvalue ** 2 if not math.isnan(lin.rvalue) else np.nan,
-            }
-        )
-    corr_rank_price = pd.DataFrame(corr_rows)
-    corr_rank_price.to_csv(output_dir / "corr_rank_price.csv", index=False)
+    write_output(positioning_summary, output_dir / "positioning_summary.csv")
 
     df["rank_weight_inv"] = np.where(df["page_rank"] > 0, 1.0 / df["page_rank"], np.nan)
     df["rank_weight_inv_sqrt"] = np.where(
         df["page_rank"] > 0, 1.0 / np.sqrt(df["page_rank"]), np.nan
     )
+    by_group = df.groupby(group_cols, observed=True)
+
+    corr_rank_price = rank_price_correlations(df, group_cols)
+    write_output(corr_rank_price, output_dir / "corr_rank_price.csv")
 
     category_totals = (
-        df.groupby(group_cols)
-        .agg(
+        by_group.agg(
             total_count=("product_name", "count"),
             total_weight_inv=("rank_weight_inv", "sum"),
             total_weight_inv_sqrt=("rank_weight_inv_sqrt", "sum"),
@@ -298,7 +424,7 @@ def main() -> None:
     )
 
     category_sov = (
-        df.groupby(group_cols + ["brand"])
+        df.groupby(group_cols + ["brand"], observed=True)
         .agg(
             item_count=("product_name", "count"),
             weight_inv=("rank_weight_inv", "sum"),
@@ -312,11 +438,11 @@ def main() -> None:
     category_sov["weighted_sov_inv_sqrt"] = (
         category_sov["weight_inv_sqrt"] / category_sov["total_weight_inv_sqrt"]
     )
-    category_sov.to_csv(output_dir / "category_sov.csv", index=False)
+    write_output(category_sov, output_dir / "category_sov.csv")
 
     market_gap = (
         df[df["price_band"].notna()]
-        .groupby(group_cols + ["price_band"])
+        .groupby(group_cols + ["price_band"], observed=True)
         .agg(
             item_count=("product_name", "count"),
             brand_count=("brand", "nunique"),
@@ -328,95 +454,92 @@ def main() -> None:
     market_gap["weighted_sov"] = market_gap["weight_inv_sqrt"] / market_gap["total_weight_inv_sqrt"]
     market_gap["supply_share"] = market_gap["item_count"] / market_gap["total_count"]
     market_gap["gap_score"] = market_gap["weighted_sov"] / market_gap["supply_share"]
-    market_gap.to_csv(output_dir / "market_gap.csv", index=False)
-
-    keyword_rows = []
-    for (week, category), group in df.groupby(group_cols):
-        counter = Counter()
-        for name in group["product_name"].dropna():
-            counter.update(tokenize(name))
-        for rank, (token, count) in enumerate(counter.most_common(20), start=1):
-            keyword_rows.append(
-                {
-                    "week_start_date": week,
-                    "category_group": category,
-                    "token": token,
-                    "count": count,
-                    "token_rank": rank,
-                }
-            )
-    top_keywords = pd.DataFrame(keyword_rows)
-    top_keywords.to_csv(output_dir / "top_keywords.csv", index=False)
-
-    brand_norm = df["brand"].str.lower().str.replace(" ", "", regex=False)
-    df["is_calmf"] = brand_norm.str.contains("calmf", na=False) | brand_norm.str.contains("캄프", na=False)
-
-    calmf_products = df[df["is_calmf"]][
-        [
-            "week_start_date",
-            "category_group",
-            "brand",
-            "product_name",
-            "page_rank",
-            "price",
-            "unit_price",
-            "log_unit_price",
-            "segment",
-            "z_log",
-            "robust_z",
-        ]
-    ].copy()
-    calmf_products.to_csv(output_dir / "calmf_products.csv", index=False)
-
-    market_median = (
-        df[df["is_valid_sheets"]]
-        .groupby(group_cols)["unit_price"]
-        .median()
-        .rename("market_median_unit_price")
-        .reset_index()
+    write_output(market_gap, output_dir / "market_gap.csv")
+
+    tokens = tokenize(df["product_name"])
+    token_df = df.loc[tokens.index, group_cols].assign(
+        token=tokens.to_numpy(), position=np.arange(len(tokens))
     )
-    calmf_median = (
-        df[df["is_calmf"] & df["is_valid_sheets"]]
-        .groupby(group_cols)["unit_price"]
-        .median()
-        .rename("calmf_median_unit_price")
+    # ties keep first-seen order, like Counter.most_common
+    top_keywords = (
+        token_df.groupby(group_cols + ["token"], observed=True)
+        .agg(count=("position", "size"), first_seen=("position", "min"))
         .reset_index()
+        .sort_values(group_cols + ["count", "first_seen"], ascending=[True, True, False, True])
+        .groupby(group_cols, observed=True)
+        .head(20)
     )
-    calmf_count = (
-        df[df["is_calmf"]]
-        .groupby(group_cols)["product_name"]
-        .count()
-        .rename("calmf_item_count")
+    top_keywords["token_rank"] = top_keywords.groupby(group_cols, observed=True).cumcount() + 1
+    top_keywords = top_keywords[group_cols + ["token", "count", "token_rank"]]
+    write_output(top_keywords, output_dir / "top_keywords.csv")
+
+    # brand is categorical: match once per distinct brand and broadcast through the codes
+    brand_norm = df["brand"].cat.categories.str.lower().str.replace(" ", "", regex=False)
+    calmf_brands = brand_norm.str.contains("calmf") | brand_norm.str.contains("캄프")
+    df["is_calmf"] = np.append(calmf_brands, False)[df["brand"].cat.codes.to_numpy()]
+
+    calmf_cols = [
+        "week_start_date",
+        "category_group",
+        "brand",
+        "product_name",
+        "page_rank",
+        "price",
+        "unit_price",
+        "log_unit_price",
+        "segment",
+        "z_log",
+        "robust_z",
+    ]
+    write_output(df, output_dir / "calmf_products.csv", columns=calmf_cols, rows=df["is_calmf"])
+
+    valid_unit_price = df["unit_price"].where(df["is_valid_sheets"])
+    calmf_vs_market = (
+        df[group_cols]
+        .assign(
+            _market_unit_price=valid_unit_price,
+            _calmf_unit_price=valid_unit_price.where(df["is_calmf"]),
+            _valid=df["is_valid_sheets"],
+            _calmf=df["is_calmf"],
+            _calmf_named=df["is_calmf"] & df["product_name"].notna(),
+        )
+        .groupby(group_cols, observed=True)
+        .agg(
+            market_median_unit_price=("_market_unit_price", "median"),
+            calmf_median_unit_price=("_calmf_unit_price", "median"),
+            calmf_item_count=("_calmf_named", "sum"),
+            valid_count=("_valid", "sum"),
+            calmf_count=("_calmf", "sum"),
+        )
         .reset_index()
     )
-    calmf_vs_market = (
-        market_median.merge(calmf_median, on=group_cols, how="left")
-        .merge(calmf_count, on=group_cols, how="left")
+    # only groups with valid sheets have a market median; groups without calmf items stay blank
+    calmf_vs_market = calmf_vs_market[calmf_vs_market["valid_count"] > 0]
+    calmf_vs_market["calmf_item_count"] = calmf_vs_market["calmf_item_count"].where(
+        calmf_vs_market["calmf_count"] > 0
     )
+    calmf_vs_market = calmf_vs_market.drop(columns=["valid_count", "calmf_count"])
     calmf_vs_market["premium_index"] = (
         calmf_vs_market["calmf_median_unit_price"] / calmf_vs_market["market_median_unit_price"]
     )
-    calmf_vs_market.to_csv(output_dir / "calmf_vs_market.csv", index=False)
+    write_output(calmf_vs_market, output_dir / "calmf_vs_market.csv")
 
-    outliers = df[df["is_outlier_iqr"]][
-        [
-            "week_start_date",
-            "category_group",
-            "brand",
-            "product_name",
-            "page_rank",
-            "price",
-            "unit_price",
-            "log_unit_price",
-            "lower_bound",
-            "upper_bound",
-        ]
-    ].copy()
-    outliers.to_csv(output_dir / "outliers.csv", index=False)
+    outlier_cols = [
+        "week_start_date",
+        "category_group",
+        "brand",
+        "product_name",
+        "page_rank",
+        "price",
+        "unit_price",
+        "log_unit_price",
+        "lower_bound",
+        "upper_bound",
+    ]
+    write_output(df, output_dir / "outliers.csv", columns=outlier_cols, rows=df["is_outlier_iqr"])
 
     data_quality = (
-        df.groupby(group_cols)
-        .agg(
+        by_group.agg(
             total_count=("product_name", "count"),
             has_sheets_rate=("has_sheets", "mean"),
             invalid_sheets_rate=("is_unrealistic_sheets", "mean"),
@@ -425,7 +548,7 @@ def main() -> None:
         .reset_index()
     )
     data_quality["missing_sheets_rate"] = 1 - data_quality["has_sheets_rate"]
-    data_quality.to_csv(output_dir / "data_quality.csv", index=False)
+    write_output(data_quality, output_dir / "data_quality.csv")
 
 
 if __name__ == "__main__":
@@ -20,6 +20,12 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import streamlit as st
 
+try:
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 # =============================================================================
 # 설정
 # =============================================================================
@@ -45,13 +51,23 @@ COLORS = {
     "danger": "#e74c3c",
 }
 
+# 구간 컬럼 고정 순서 (load_data에서 ordered Categorical로 변환)
+SEGMENT_ORDER = ["Mass", "Premium", "Luxury", "Unknown"]
+RANK_BUCKET_ORDER = ["Top10", "Top20", "Top50", "Top100", "100+"]
+
+# 세그먼트 색상 매핑 (산점도/파이 차트 공통)
+SEGMENT_COLOR_MAP = {k: COLORS[k] for k in SEGMENT_ORDER}
+
+# 차트 공통 투명 배경 (update_layout(**CHART_BG, ...))
+CHART_BG = dict(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+
 # =============================================================================
 # 데이터 로드
 # =============================================================================
 
 @st.cache_data
 def load_data():
-    """CSV 파일들을 로드"""
+    """CSV 파일들을 로드 (build_outputs.py가 함께 저장한 Parquet이 최신이면 우선 사용)"""
     data = {}
     files = [
         "clean_long", "positioning_scatter", "positioning_summary",
@@ -62,13 +78,97 @@ def load_data():
     
     for name in files:
         path = Path(OUTPUT_DIR) / f"{name}.csv"
-        if path.exists():
+        parquet_path = path.with_suffix(".parquet")
+        if HAS_PYARROW and parquet_path.exists() and (
+            not path.exists() or parquet_path.stat().st_mtime >= path.stat().st_mtime
+        ):
+            data[name] = pq.read_table(parquet_path, memory_map=True).to_pandas()
+        elif path.exists():
             data[name] = pd.read_csv(path)
         else:
             data[name] = pd.DataFrame()
     
+    # 세그먼트/랭크 구간은 고정 순서 Categorical로 (필터/정렬이 정수 코드 비교)
+    for name in ["clean_long", "positioning_scatter"]:
+        df = data[name]
+        if "segment" in df.columns:
+            df["segment"] = pd.Categorical(df["segment"], categories=SEGMENT_ORDER, ordered=True)
+        if "rank_bucket" in df.columns:
+            df["rank_bucket"] = pd.Categorical(df["rank_bucket"], categories=RANK_BUCKET_ORDER, ordered=True)
+    
+    # 주차/카테고리 필터 컬럼은 category로 (주차·카테고리 선택 비교가 문자열이 아닌 정수 코드 비교)
+    for name in ["clean_long", "positioning_scatter", "category_sov", "market_gap"]:
+        df = data[name]
+        for col in ["week_start_date", "category_for_group", "category_group"]:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+    
+    # 캄프 상품 여부는 로드 시 한 번만 계산 (브랜드 또는 상품명 기준)
+    scatter = data["positioning_scatter"]
+    if not scatter.empty:
+        scatter["is_calmf"] = (
+            scatter["brand"].str.contains("calmf|캄프", case=False, na=False)
+            | scatter["product_name"].str.contains("calmf|캄프", case=False, na=False)
+        )
+    
     return data
 
+
+@st.cache_data
+def build_indices():
+    """테이블별 주차/카테고리 행 위치 (rerun마다 전체 행을 비교하지 않고 위치로 바로 조회)"""
+    data = load_data()
+    indices = {}
+    for name in ["clean_long", "positioning_scatter", "category_sov", "market_gap"]:
+        df = data[name]
+        if df.empty or "week_start_date" not in df.columns:
+            continue
+        cat_col = next((c for c in ["category_for_group", "category_group"] if c in df.columns), None)
+        indices[name] = {
+            "week": df.groupby("week_start_date", observed=True, sort=False).indices,
+            "week_category": (
+                df.groupby(["week_start_date", cat_col], observed=True, sort=False).indices if cat_col else None
+            ),
+        }
+    return indices
+
+
+def select_rows(data, name, week, category="전체"):
+    """선택한 주차(와 카테고리)의 행만 반환"""
+    df = data[name]
+    index = build_indices().get(name)
+    if not week or index is None:
+        return df
+    if category != "전체" and index["week_category"] is not None:
+        positions = index["week_category"].get((week, category))
+    else:
+        positions = index["week"].get(week)
+    if positions is None:
+        return df.iloc[:0]
+    return df.iloc[positions]
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def segment_counts(week, category="전체"):
+    """선택한 주차/카테고리의 세그먼트별 상품 수 (주차/카테고리 조합별로 한 번만 집계)"""
+    df = select_rows(load_data(), "clean_long", week, category)
+    if df.empty or "segment" not in df.columns:
+        return None
+    counts = df["segment"].value_counts().reset_index()
+    counts.columns = ["segment", "count"]
+    return counts[counts["count"] > 0]
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_kpis(week, category="전체"):
+    """선택한 주차/카테고리의 기본 KPI (상품 수, 브랜드 수, 1매당 가격 중앙값)"""
+    df = select_rows(load_data(), "clean_long", week, category)
+    return {
+        "total_products": len(df),
+        "brands": df["brand"].nunique(),
+        "median_price": df["unit_price"].median(),
+    }
+
 # =============================================================================
 # 커스텀 CSS
 # =============================================================================
@@ -82,6 +182,11 @@ def apply_custom_css():
     }
     
     /* KPI 카드 */
+    .kpi-grid {
+        display: grid;
+        grid-template-columns: repeat(7, minmax(0, 1fr));
+        gap: 1rem;
+    }
     .kpi-card {
         background: linear-gradient(145deg, #2d3436 0%, #1e272e 100%);
         border-radius: 16px;
@@ -266,8 +371,8 @@ def apply_custom_css():
 # KPI 컴포넌트
 # =============================================================================
 
-def render_kpi(value, label, description="", format_type="number", prefix="", suffix="", tooltip=""):
-    """KPI 카드 렌더링 (툴팁 지원)"""
+def kpi_html(value, label, description="", format_type="number", prefix="", suffix="", tooltip=""):
+    """KPI 카드 HTML 생성 (툴팁 지원) - 여러 카드를 모아 한 번에 렌더링"""
     if pd.isna(value):
         formatted = "N/A"
     elif format_type == "number":
@@ -293,13 +398,14 @@ def render_kpi(value, label, description="", format_type="number", prefix="", su
         )
         help_icon = f'<span class="kpi-help" data-tooltip="{tooltip_escaped}">?</span>'
     
-    st.markdown(f"""
-    <div class="kpi-card">
-        <div class="kpi-label">{label}{help_icon}</div>
-        <div class="kpi-value">{formatted}</div>
-        <div class="kpi-desc">{description}</div>
-    </div>
-    """, unsafe_allow_html=True)
+    # 들여쓰기/빈 줄 없이 이어 붙여야 마크다운 코드 블록으로 해석되지 않음
+    return (
+        f'<div class="kpi-card">'
+        f'<div class="kpi-label">{label}{help_icon}</div>'
+        f'<div class="kpi-value">{formatted}</div>'
+        f'<div class="kpi-desc">{description}</div>'
+        f'</div>'
+    )
 
 def render_section_header(title, description="", icon="📊"):
     """섹션 헤더 렌더링"""
@@ -357,7 +463,22 @@ def render_dark_table(df, columns=None, rename_cols=None, number_cols=None):
 # =============================================================================
 # 차트 함수
 # =============================================================================
+# 차트 함수는 입력 DataFrame 해시 기준으로 캐시 (필터가 같으면 rerun 시 figure 재사용)
 
+def to_plot_precision(df, columns):
+    """점 단위로 그리는 숫자 컬럼을 32비트로 축소 (브라우저로 보내는 배열 크기 절반)"""
+    narrowed = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        if pd.api.types.is_float_dtype(df[col]):
+            narrowed[col] = df[col].astype(np.float32)
+        elif pd.api.types.is_integer_dtype(df[col]):
+            narrowed[col] = df[col].astype(np.int32)
+    return df.assign(**narrowed)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
 def create_scatter_plot(df, calmf_df=None):
     """포지셔닝 산점도 (캄프 강조 포함)
     
@@ -368,25 +489,23 @@ def create_scatter_plot(df, calmf_df=None):
     if df.empty:
         return None
     
-    # 세그먼트 색상 매핑
-    color_map = {
-        "Mass": COLORS["Mass"],
-        "Premium": COLORS["Premium"],
-        "Luxury": COLORS["Luxury"],
-        "Unknown": COLORS["Unknown"]
-    }
-    
-    # 호버 데이터 소수점 2자리 포맷팅
-    df_plot = df.copy()
-    df_plot["unit_price_fmt"] = df_plot["unit_price"].apply(lambda x: f"₩{x:,.2f}" if pd.notna(x) else "N/A")
-    df_plot["log_price_fmt"] = df_plot["log_unit_price"].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
+    # 차트에 쓰는 컬럼만 골라 호버용 포맷 컬럼(소수점 2자리)만 추가
+    plot_cols = [c for c in ["log_unit_price", "page_rank", "segment", "brand", "product_name", "total_sheets"] if c in df.columns]
+    unit_price = df["unit_price"]
+    log_price = df["log_unit_price"]
+    df_plot = df[plot_cols].assign(
+        unit_price_fmt=("₩" + unit_price.map("{:,.2f}".format)).where(unit_price.notna(), "N/A"),
+        log_price_fmt=log_price.map("{:.2f}".format).where(log_price.notna(), "N/A"),
+    )
+    df_plot = to_plot_precision(df_plot, ["log_unit_price", "page_rank", "total_sheets"])
     
     fig = px.scatter(
         df_plot,
         x="log_unit_price",
         y="page_rank",
         color="segment",
-        color_discrete_map=color_map,
+        color_discrete_map=SEGMENT_COLOR_MAP,
+        render_mode="webgl",  # 상품 수가 많아도 SVG 대신 WebGL로 렌더링
         hover_data={"brand": True, "product_name": True, "unit_price_fmt": True, "total_sheets": True, "log_unit_price": False, "segment": False},
         title="",
         labels={
@@ -398,36 +517,38 @@ def create_scatter_plot(df, calmf_df=None):
     )
     
     # 캄프 상품 강조 표시 (별 마커 + 큰 크기)
-    if calmf_df is not None and not calmf_df.empty:
-        # 캄프 상품 좌표 찾기
-        for _, row in calmf_df.iterrows():
-            if pd.notna(row.get("log_unit_price")) and pd.notna(row.get("page_rank")):
-                fig.add_trace(
-                    go.Scatter(
-                        x=[row["log_unit_price"]],
-                        y=[row["page_rank"]],
-                        mode="markers+text",
-                        marker=dict(
-                            size=25,
-                            color="#f1c40f",  # 노란색
-                            symbol="star",
-                            line=dict(width=2, color="#fff")
-                        ),
-                        text="⭐ 캄프",
-                        textposition="top center",
-                        textfont=dict(size=12, color="#f1c40f"),
-                        name="Calmf",
-                        showlegend=True,
-                        hovertemplate=f"<b>캄프</b><br>{row.get('product_name', '')}<br>가격: ₩{row.get('unit_price', 0):,.0f}/매<extra></extra>"
-                    )
+    if calmf_df is not None and not calmf_df.empty and {"log_unit_price", "page_rank"} <= set(calmf_df.columns):
+        # 캄프 상품 좌표 찾기 (좌표가 있는 상품 전체를 하나의 trace로, 텍스트 라벨 때문에 SVG 유지)
+        calmf_points = calmf_df[calmf_df["log_unit_price"].notna() & calmf_df["page_rank"].notna()]
+        if not calmf_points.empty:
+            names = calmf_points["product_name"].astype(str) if "product_name" in calmf_points.columns else ""
+            prices = calmf_points["unit_price"] if "unit_price" in calmf_points.columns else pd.Series(0, index=calmf_points.index)
+            fig.add_trace(
+                go.Scatter(
+                    x=calmf_points["log_unit_price"].to_numpy(),
+                    y=calmf_points["page_rank"].to_numpy(),
+                    mode="markers+text",
+                    marker=dict(
+                        size=25,
+                        color="#f1c40f",  # 노란색
+                        symbol="star",
+                        line=dict(width=2, color="#fff")
+                    ),
+                    text="⭐ 캄프",
+                    textposition="top center",
+                    textfont=dict(size=12, color="#f1c40f"),
+                    name="Calmf",
+                    showlegend=True,
+                    hovertext=("<b>캄프</b><br>" + names + "<br>가격: ₩" + prices.map("{:,.0f}".format) + "/매").to_numpy(),
+                    hovertemplate="%{hovertext}<extra></extra>"
                 )
+            )
     
     # Y축 역순 (낮은 랭크가 위)
     fig.update_yaxes(autorange="reversed")
     
     fig.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
+        **CHART_BG,
         font=dict(color="#ffffff"),
         legend=dict(
             orientation="h",
@@ -447,6 +568,7 @@ def create_scatter_plot(df, calmf_df=None):
     return fig
 
 
+@st.cache_data(show_spinner=False, max_entries=32)
 def create_sov_bar_chart(df, top_n=15):
     """브랜드별 SOV 바 차트"""
     if df.empty:
@@ -466,8 +588,7 @@ def create_sov_bar_chart(df, top_n=15):
     )
     
     fig.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
+        **CHART_BG,
         font=dict(color="#ecf0f1"),
         showlegend=False,
         height=400,
@@ -477,6 +598,7 @@ def create_sov_bar_chart(df, top_n=15):
     return fig
 
 
+@st.cache_data(show_spinner=False, max_entries=32)
 def create_gap_heatmap(df):
     """Market Gap 히트맵"""
     if df.empty:
@@ -494,8 +616,7 @@ def create_gap_heatmap(df):
     )
     
     fig.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
+        **CHART_BG,
         font=dict(color="#ecf0f1"),
         height=350
     )
@@ -503,6 +624,7 @@ def create_gap_heatmap(df):
     return fig
 
 
+@st.cache_data(show_spinner=False, max_entries=32)
 def create_keywords_chart(df, top_n=15):
     """키워드 빈도 차트"""
     if df.empty:
@@ -522,8 +644,7 @@ def create_keywords_chart(df, top_n=15):
     )
     
     fig.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
+        **CHART_BG,
         font=dict(color="#ecf0f1"),
         showlegend=False,
         height=400,
@@ -533,33 +654,23 @@ def create_keywords_chart(df, top_n=15):
     return fig
 
 
-def create_segment_pie(df):
-    """세그먼트 파이 차트"""
-    if df.empty or "segment" not in df.columns:
+@st.cache_data(show_spinner=False, max_entries=32)
+def create_segment_pie(segment_counts):
+    """세그먼트 파이 차트 (segment_counts: segment_counts()의 세그먼트별 상품 수)"""
+    if segment_counts is None or segment_counts.empty:
         return None
     
-    segment_counts = df["segment"].value_counts().reset_index()
-    segment_counts.columns = ["segment", "count"]
-    
-    color_map = {
-        "Mass": COLORS["Mass"],
-        "Premium": COLORS["Premium"],
-        "Luxury": COLORS["Luxury"],
-        "Unknown": COLORS["Unknown"]
-    }
-    
     fig = px.pie(
         segment_counts,
         values="count",
         names="segment",
         color="segment",
-        color_discrete_map=color_map,
+        color_discrete_map=SEGMENT_COLOR_MAP,
         hole=0.4
     )
     
     fig.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
+        **CHART_BG,
         font=dict(color="#ffffff"),
         height=300,
         showlegend=True,
@@ -569,24 +680,22 @@ def create_segment_pie(df):
     return fig
 
 
+@st.cache_data(show_spinner=False, max_entries=32)
 def create_rank_distribution(df):
     """랭크 구간별 가격 분포"""
     if df.empty:
         return None
     
-    # 랭크 버킷 순서
-    bucket_order = ["Top10", "Top20", "Top50", "Top100", "100+"]
-    df_plot = df[df["rank_bucket"].isin(bucket_order)].copy()
-    
-    # 소수점 2자리로 반올림
-    df_plot["unit_price"] = df_plot["unit_price"].round(2)
+    # rank_bucket은 load_data에서 RANK_BUCKET_ORDER 외의 값이 NaN이 된 Categorical
+    # 가격 표시는 hovertemplate(₩%{y:,.2f})와 tickformat이 담당하므로 값은 반올림하지 않음
+    df_plot = to_plot_precision(df[df["rank_bucket"].notna()], ["unit_price"])
     
     fig = px.box(
         df_plot,
         x="rank_bucket",
         y="unit_price",
         color="rank_bucket",
-        category_orders={"rank_bucket": bucket_order},
+        category_orders={"rank_bucket": RANK_BUCKET_ORDER},
         title="",
         labels={"unit_price": "1매당 가격 (₩)", "rank_bucket": "랭크 구간"}
     )
@@ -595,8 +704,7 @@ def create_rank_distribution(df):
     fig.update_traces(hovertemplate="<b>%{x}</b><br>가격: ₩%{y:,.2f}<extra></extra>")
     
     fig.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
+        **CHART_BG,
         font=dict(color="#ffffff"),
         showlegend=False,
         height=350,
@@ -659,11 +767,7 @@ def main():
     st.markdown("---")
     
     # 데이터 필터링
-    df_main = data["clean_long"].copy()
-    if selected_week:
-        df_main = df_main[df_main["week_start_date"] == selected_week]
-    if selected_category != "전체":
-        df_main = df_main[df_main["category_for_group"] == selected_category]
+    df_main = select_rows(data, "clean_long", selected_week, selected_category)
     
     # ==========================================================================
     # KPI 섹션
@@ -675,78 +779,71 @@ def main():
         "📈"
     )
     
-    # 7개 KPI 컬럼 (캄프 1매당 가격 추가)
-    col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
+    # 7개 KPI 카드 (캄프 1매당 가격 추가) - st.columns 대신 그리드 한 번으로 렌더링
+    kpi_cards = []
+    kpis = compute_kpis(selected_week, selected_category)
     
-    with col1:
-        total_products = len(df_main)
-        render_kpi(total_products, "상품 수", "분석 대상 상품")
+    kpi_cards.append(kpi_html(kpis["total_products"], "상품 수", "분석 대상 상품"))
     
-    with col2:
-        brands = df_main["brand"].nunique()
-        render_kpi(brands, "브랜드", "중복 제거")
+    kpi_cards.append(kpi_html(kpis["brands"], "브랜드", "중복 제거"))
     
-    with col3:
-        median_price = df_main["unit_price"].median()
-        render_kpi(median_price, "시장 중앙값", "1매당 가격", format_type="currency")
+    kpi_cards.append(kpi_html(kpis["median_price"], "시장 중앙값", "1매당 가격", format_type="currency"))
     
-    with col4:
-        # 캄프 1매당 가격 (신규 추가)
-        calmf_vs = data["calmf_vs_market"]
-        if not calmf_vs.empty:
-            calmf_price = calmf_vs["calmf_median_unit_price"].iloc[0]
-            render_kpi(calmf_price, "캄프 단가", "1매당 가격", format_type="currency")
-        else:
-            render_kpi(None, "캄프 단가", "1매당 가격")
+    # 캄프 1매당 가격 (신규 추가)
+    calmf_vs = data["calmf_vs_market"]
+    if not calmf_vs.empty:
+        calmf_price = calmf_vs["calmf_median_unit_price"].iloc[0]
+        kpi_cards.append(kpi_html(calmf_price, "캄프 단가", "1매당 가격", format_type="currency"))
+    else:
+        kpi_cards.append(kpi_html(None, "캄프 단가", "1매당 가격"))
+    
+    # 캄프 프리미엄 지수 (툴팁 추가)
+    if not calmf_vs.empty:
+        premium_idx = calmf_vs["premium_index"].iloc[0]
+        kpi_cards.append(kpi_html(
+            premium_idx, 
+            "프리미엄 지수", 
+            "캄프/시장", 
+            format_type="decimal",
+            tooltip="📐 수식: 캄프 중앙값 ÷ 시장 중앙값\n\n해석:\n• = 1.0 → 시장 평균 가격\n• > 1.0 → 프리미엄 (비쌈)\n• < 1.0 → 가성비 (저렴)"
+        ))
+    else:
+        kpi_cards.append(kpi_html(None, "프리미엄 지수", "캄프/시장"))
     
-    with col5:
-        # 캄프 프리미엄 지수 (툴팁 추가)
-        if not calmf_vs.empty:
-            premium_idx = calmf_vs["premium_index"].iloc[0]
-            render_kpi(
-                premium_idx, 
-                "프리미엄 지수", 
-                "캄프/시장", 
-                format_type="decimal",
-                tooltip="📐 수식: 캄프 중앙값 ÷ 시장 중앙값\n\n해석:\n• = 1.0 → 시장 평균 가격\n• > 1.0 → 프리미엄 (비쌈)\n• < 1.0 → 가성비 (저렴)"
-            )
-        else:
-            render_kpi(None, "프리미엄 지수", "캄프/시장")
-    
-    with col6:
-        # Spearman 상관 (툴팁 추가)
-        corr = data["corr_rank_price"]
-        if not corr.empty:
-            spearman = corr["spearman_rho"].iloc[0]
-            spearman_p = corr["spearman_p"].iloc[0] if "spearman_p" in corr.columns else None
-            
-            # p-value 해석 포함
-            if pd.notna(spearman_p):
-                if spearman_p < 0.05:
-                    p_text = f"\n\n✅ p-value={spearman_p:.4f}\n→ 상관관계 유의함 (p<0.05)"
-                else:
-                    p_text = f"\n\n⚠️ p-value={spearman_p:.4f}\n→ 상관관계 없음 (p≥0.05)"
+    # Spearman 상관 (툴팁 추가)
+    corr = data["corr_rank_price"]
+    if not corr.empty:
+        spearman = corr["spearman_rho"].iloc[0]
+        spearman_p = corr["spearman_p"].iloc[0] if "spearman_p" in corr.columns else None
+        
+        # p-value 해석 포함
+        if pd.notna(spearman_p):
+            if spearman_p < 0.05:
+                p_text = f"\n\n✅ p-value={spearman_p:.4f}\n→ 상관관계 유의함 (p<0.05)"
             else:
-                p_text = ""
-            
-            render_kpi(
-                spearman, 
-                "Spearman r", 
-                "가격↔랭크", 
-                format_type="decimal",
-                tooltip=f"📐 Spearman 순위상관계수\n\n상관계수(r) 해석:\n• r > 0 → 양의 상관\n• r = 0 → 상관 없음\n• r < 0 → 음의 상관{p_text}"
-            )
+                p_text = f"\n\n⚠️ p-value={spearman_p:.4f}\n→ 상관관계 없음 (p≥0.05)"
         else:
-            render_kpi(None, "Spearman r", "가격↔랭크")
+            p_text = ""
+        
+        kpi_cards.append(kpi_html(
+            spearman, 
+            "Spearman r", 
+            "가격↔랭크", 
+            format_type="decimal",
+            tooltip=f"📐 Spearman 순위상관계수\n\n상관계수(r) 해석:\n• r > 0 → 양의 상관\n• r = 0 → 상관 없음\n• r < 0 → 음의 상관{p_text}"
+        ))
+    else:
+        kpi_cards.append(kpi_html(None, "Spearman r", "가격↔랭크"))
     
-    with col7:
-        # Parse fail rate
-        dq = data["data_quality"]
-        if not dq.empty:
-            parse_fail = 1 - dq["has_sheets_rate"].iloc[0]
-            render_kpi(parse_fail, "Parse Fail", "매수 추출 실패", format_type="percent")
-        else:
-            render_kpi(None, "Parse Fail", "매수 추출 실패")
+    # Parse fail rate
+    dq = data["data_quality"]
+    if not dq.empty:
+        parse_fail = 1 - dq["has_sheets_rate"].iloc[0]
+        kpi_cards.append(kpi_html(parse_fail, "Parse Fail", "매수 추출 실패", format_type="percent"))
+    else:
+        kpi_cards.append(kpi_html(None, "Parse Fail", "매수 추출 실패"))
+    
+    st.markdown('<div class="kpi-grid">' + "".join(kpi_cards) + "</div>", unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -763,17 +860,10 @@ def main():
     col_left, col_right = st.columns([2, 1])
     
     with col_left:
-        scatter_df = data["positioning_scatter"]
-        if selected_week:
-            scatter_df = scatter_df[scatter_df["week_start_date"] == selected_week]
-        if selected_category != "전체":
-            scatter_df = scatter_df[scatter_df["category_for_group"] == selected_category]
+        scatter_df = select_rows(data, "positioning_scatter", selected_week, selected_category)
         
-        # 캄프 상품 필터링 (scatter_df에서 직접 찾기)
-        calmf_df = scatter_df[
-            scatter_df["brand"].str.lower().str.contains("calmf|캄프", na=False) |
-            scatter_df["product_name"].str.lower().str.contains("calmf|캄프", na=False)
-        ]
+        # 캄프 상품 필터링 (load_data에서 계산한 is_calmf 사용)
+        calmf_df = scatter_df[scatter_df["is_calmf"]]
         
         fig_scatter = create_scatter_plot(scatter_df, calmf_df)
         if fig_scatter:
@@ -784,7 +874,7 @@ def main():
     with col_right:
         st.markdown("<h4 style='color: #ffffff;'>세그먼트 분포</h4>", unsafe_allow_html=True)
         st.markdown("<p style='color: #b2bec3; font-size: 0.85rem;'>가격 구간별 상품 비율 (Mass/Premium/Luxury)</p>", unsafe_allow_html=True)
-        fig_pie = create_segment_pie(df_main)
+        fig_pie = create_segment_pie(segment_counts(selected_week, selected_category))
         if fig_pie:
             st.plotly_chart(fig_pie, use_container_width=True)
         
@@ -819,9 +909,7 @@ def main():
         </p>
         """, unsafe_allow_html=True)
         
-        sov_df = data["category_sov"]
-        if selected_week and not sov_df.empty and "week_start_date" in sov_df.columns:
-            sov_df = sov_df[sov_df["week_start_date"] == selected_week]
+        sov_df = select_rows(data, "category_sov", selected_week)
         
         fig_sov = create_sov_bar_chart(sov_df, top_n=15)
         if fig_sov:
@@ -840,9 +928,7 @@ def main():
         </p>
         """, unsafe_allow_html=True)
         
-        gap_df = data["market_gap"]
-        if selected_week and not gap_df.empty and "week_start_date" in gap_df.columns:
-            gap_df = gap_df[gap_df["week_start_date"] == selected_week]
+        gap_df = select_rows(data, "market_gap", selected_week)
         
         fig_gap = create_gap_heatmap(gap_df)
         if fig_gap:
@@ -850,13 +936,14 @@ def main():
         
         # 가격대별 범위 표시
         if not gap_df.empty and "min_price" in gap_df.columns:
-            price_ranges = []
-            for _, row in gap_df.sort_values("price_band").iterrows():
-                band = row["price_band"]
-                min_p = row.get("min_price", 0)
-                max_p = row.get("max_price", 0)
-                if pd.notna(min_p) and pd.notna(max_p):
-                    price_ranges.append(f"<b>{band}</b>: ₩{min_p:,.0f}~{max_p:,.0f}")
+            bands = gap_df.sort_values("price_band")
+            min_p = bands["min_price"]
+            max_p = bands["max_price"] if "max_price" in bands.columns else pd.Series(0, index=bands.index)
+            known = min_p.notna() & max_p.notna()
+            price_ranges = (
+                "<b>" + bands.loc[known, "price_band"].astype(str) + "</b>: ₩"
+                + min_p[known].map("{:,.0f}".format) + "~" + max_p[known].map("{:,.0f}".format)
+            ).tolist()
             if price_ranges:
                 st.markdown(f"""
                 <p style='color: #b2bec3; font-size: 0.75rem; margin-top: -10px;'>
@@ -866,7 +953,9 @@ def main():
         
         # Gap 해석
         if not gap_df.empty:
-            top_gap = gap_df.nlargest(1, "gap_score")
+            # 최댓값 한 행만 필요하므로 정렬 없이 idxmax (동점이면 첫 행, 전부 NaN이면 첫 행: nlargest(1)과 동일)
+            gap_scores = gap_df["gap_score"].dropna()
+            top_gap = gap_df.loc[[gap_scores.idxmax()]] if not gap_scores.empty else gap_df.iloc[:1]
             if not top_gap.empty:
                 best_band = top_gap.iloc[0]["price_band"]
                 min_p = top_gap.iloc[0].get("min_price", 0)
@@ -976,15 +1065,19 @@ def main():
                 "랭크 누락": dq["missing_rank_rate"].iloc[0],
             }
             
+            # 지표 행을 모아 한 번의 st.markdown으로 렌더링
+            rows_html = []
             for name, value in metrics.items():
                 if pd.notna(value):
                     color = "#27ae60" if (name == "매수 추출률" and value > 0.8) or (name != "매수 추출률" and value < 0.1) else "#e74c3c"
-                    st.markdown(f"""
+                    rows_html.append(f"""
                     <div style='display: flex; justify-content: space-between; padding: 8px 0; border-bottom: 1px solid rgba(255,255,255,0.1);'>
                         <span style='color: #b2bec3;'>{name}</span>
                         <span style='color: {color}; font-weight: bold;'>{value:.1%}</span>
                     </div>
-                    """, unsafe_allow_html=True)
+                    """)
+            if rows_html:
+                st.markdown("".join(rows_html), unsafe_allow_html=True)
     
     with col2:
         st.markdown("<h5 style='color: #ffffff;'>이상치 목록</h5>", unsafe_allow_html=True)